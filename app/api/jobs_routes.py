@@ -10,10 +10,15 @@ Estos endpoints permiten:
 
 import asyncio
 import logging
+from collections import deque
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import StreamingResponse
+import orjson
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
+
+from app.api.responses import PydanticResponse
 
 from app.schemas.requests import (
     CreateJobRequest,
@@ -21,19 +26,93 @@ from app.schemas.requests import (
     JobStatusResponse,
     JobListResponse,
     JobInfo,
+    JobProgressInfo,
     JobResultResponse,
     JobCancelResponse,
     JobKillResponse,
     JobDeleteResponse,
     QueueStatusResponse
 )
+from app.api.routes import AUDIO_MEDIA_TYPES
 from app.services.job_manager import job_manager, JobStatus
-from app.services.job_processors import get_processor
+from app.services.job_processors import get_processor, validate_request_data
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+class _ModelPool:
+    """
+    Free-list acotada de instancias de un modelo de respuesta.
+    
+    Los handlers que serializan la respuesta en el momento (PydanticResponse) devuelven
+    las instancias al pool al terminar, evitando reservar objetos nuevos en cada
+    consulta de estado/listado. Los campos se asignan con object.__setattr__ para
+    saltarse la validación de Pydantic. Solo se usa desde el event loop (sin awaits
+    entre rent y release), por lo que no necesita lock.
+    """
+    
+    def __init__(self, model, max_size: int = 256):
+        self._model = model
+        self._field_names = tuple(model.model_fields)
+        self._max_size = max_size
+        self._free = deque()
+    
+    def rent(self, **values):
+        """Obtiene una instancia del pool (o crea una) con los valores indicados."""
+        try:
+            obj = self._free.pop()
+        except IndexError:
+            obj = self._model.model_construct()
+        for name, value in values.items():
+            object.__setattr__(obj, name, value)
+        return obj
+    
+    def release(self, obj):
+        """Devuelve una instancia al pool, limpiando sus valores."""
+        if len(self._free) < self._max_size:
+            # Solo se limpian los campos del modelo (se sueltan las referencias a los valores)
+            for name in self._field_names:
+                object.__setattr__(obj, name, None)
+            self._free.append(obj)
+
+
+_JOB_LIST_ADAPTER = TypeAdapter(list[JobInfo])
+
+_progress_pool = _ModelPool(JobProgressInfo)
+_job_info_pool = _ModelPool(JobInfo)
+
+
+def _job_info(data: dict) -> JobInfo:
+    """
+    Construye JobInfo a partir de Job.to_dict() sin pasar por la validación.
+    Los datos los genera el propio JobManager, así que validar cada campo es trabajo inútil.
+    """
+    progress = _progress_pool.rent(**data["progress"])
+    return _job_info_pool.rent(**{**data, "progress": progress})
+
+
+def _parse_status(status: Optional[str]) -> Optional[JobStatus]:
+    """Valida el filtro de estado de los listados de jobs."""
+    if not status:
+        return None
+    try:
+        return JobStatus(status)
+    except ValueError:
+        valid_statuses = [s.value for s in JobStatus]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Estado inválido: {status}. Opciones válidas: {valid_statuses}"
+        )
+
+
+def _release_job_infos(infos) -> None:
+    """Devuelve al pool los JobInfo (y su progreso) de una respuesta ya serializada."""
+    for info in infos:
+        _progress_pool.release(info.progress)
+        _job_info_pool.release(info)
+
+
 @router.post(
     "/jobs",
     response_model=CreateJobResponse,
@@ -65,34 +144,42 @@ async def create_job(request: CreateJobRequest):
     Crea un nuevo job de generación de audio y lo encola para procesamiento FIFO.
     """
     try:
+        # Obtener el procesador y validar los datos antes de ocupar la cola
+        processor = get_processor(request.job_type)
+        request_data = validate_request_data(request.job_type, request.request_data)
+        
         # Asegurar que los workers estén iniciados
         await job_manager._start_workers()
         
         # Crear el job
         job = job_manager.create_job(
             job_type=request.job_type,
-            request_data=request.request_data
+            request_data=request_data
         )
         
-        # Obtener el procesador
-        processor = get_processor(request.job_type)
-        
-        # Encolar el job para procesamiento FIFO
-        await job_manager._queue.put((job, processor))
+        # Encolar el job para procesamiento FIFO (rechazar si la cola está llena)
+        if not job_manager.try_enqueue(job, processor):
+            job_manager.delete_job(job.id)
+            raise HTTPException(
+                status_code=503,
+                detail="La cola de jobs está llena. Inténtelo de nuevo más tarde."
+            )
         
         # Obtener posición en la cola
-        queue_size = job_manager._queue.qsize()
+        queue_size = job_manager.queue_size()
         
-        logger.info(f"Job creado y encolado: {job.id} (posición en cola: {queue_size})")
+        logger.info(f"Job creado y encolado: {job.id} (posición en cola: {queue_size}, request: {request.request_hash})")
         
         return CreateJobResponse(
             success=True,
             job_id=job.id,
-            job=JobInfo(**job.to_dict()),
+            job=_job_info(job.to_dict()),
             stream_url=f"/api/v1/jobs/{job.id}/stream",
             status_url=f"/api/v1/jobs/{job.id}/status"
         )
         
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Error validando job: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -115,15 +202,14 @@ async def get_queue_status():
     """
     Obtiene el estado de la cola de procesamiento FIFO.
     """
-    # Manejar caso cuando la cola no está inicializada
-    pending = job_manager._queue.qsize() if job_manager._queue is not None else 0
+    pending = job_manager.queue_size()
     processing = job_manager._processing_count
     max_concurrent = job_manager._max_concurrent
     
-    # Contar jobs por estado
-    all_jobs = job_manager.list_jobs()
-    completed = len([j for j in all_jobs if j['status'] == 'completed'])
-    failed = len([j for j in all_jobs if j['status'] == 'failed'])
+    # Contar jobs por estado (solo IDs, sin serializar los jobs)
+    total = len(job_manager.list_job_ids())
+    completed = len(job_manager.list_job_ids(JobStatus.COMPLETED))
+    failed = len(job_manager.list_job_ids(JobStatus.FAILED))
     
     return {
         "queue": {
@@ -132,7 +218,7 @@ async def get_queue_status():
             "max_concurrent": max_concurrent
         },
         "jobs": {
-            "total": len(all_jobs),
+            "total": total,
             "completed": completed,
             "failed": failed
         },
@@ -156,9 +242,10 @@ async def get_job_status(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail=f"Job no encontrado: {job_id}")
     
-    return JobStatusResponse(
-        job=JobInfo(**job.to_dict())
-    )
+    info = _job_info(job.to_dict())
+    response = PydanticResponse(JobStatusResponse(job=info))
+    _release_job_infos((info,))
+    return response
 
 
 @router.get(
@@ -170,7 +257,7 @@ async def get_job_status(job_id: str):
     
     El stream envía eventos:
     - progress: Actualización de progreso (stage, percent, message)
-    - heartbeat: Ping cada segundo para mantener la conexión viva
+    - heartbeat: Ping tras 15 segundos sin eventos para mantener la conexión viva
     - completed: Job completado exitosamente (incluye resultado)
     - error: Error durante el procesamiento
     - cancelled: Job cancelado suavemente
@@ -243,28 +330,53 @@ async def stream_job_progress(job_id: str):
     description="Retorna la lista de todos los jobs activos y recientes.",
     tags=["Async Jobs"]
 )
-async def list_jobs(status: Optional[str] = None):
+async def list_jobs(
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000, description="Máximo de jobs a devolver"),
+    offset: int = Query(0, ge=0, description="Número de jobs a saltar")
+):
     """
-    Lista todos los jobs, opcionalmente filtrados por estado.
+    Lista los jobs, opcionalmente filtrados por estado y paginados.
     """
-    # Validar estado si se proporciona
-    job_status = None
-    if status:
-        try:
-            job_status = JobStatus(status)
-        except ValueError:
-            valid_statuses = [s.value for s in JobStatus]
-            raise HTTPException(
-                status_code=400,
-                detail=f"Estado inválido: {status}. Opciones válidas: {valid_statuses}"
-            )
+    job_status = _parse_status(status)
+    total = len(job_manager.list_job_ids(job_status))
+    jobs = job_manager.list_jobs(status=job_status, limit=limit, offset=offset)
+    
+    infos = [_job_info(job) for job in jobs]
+    # Serializar la lista completa en una sola llamada a pydantic-core (mismo JSON que JobListResponse)
+    body = b''.join((
+        b'{"jobs":',
+        _JOB_LIST_ADAPTER.dump_json(infos, by_alias=True, exclude_none=True),
+        b',"total":',
+        str(total).encode(),
+        b'}'
+    ))
+    _release_job_infos(infos)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/jobs/stream",
+    summary="Listar jobs en streaming (NDJSON)",
+    description="""
+    Igual que GET /jobs, pero devuelve un job por línea (application/x-ndjson)
+    a medida que se serializa, sin construir un único JSON con todos los jobs.
+    Cada línea tiene el mismo formato que un elemento de `jobs` en GET /jobs.
+    """,
+    tags=["Async Jobs"],
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
+async def stream_jobs(status: Optional[str] = None):
+    """
+    Lista los jobs como NDJSON.
+    """
+    job_status = _parse_status(status)
     
-    jobs = job_manager.list_jobs(status=job_status)
+    async def generate():
+        for job in job_manager.iter_jobs(status=job_status):
+            yield orjson.dumps(job.to_dict(include_result=False)) + b"\n"
     
-    return JobListResponse(
-        jobs=[JobInfo(**job) for job in jobs],
-        total=len(jobs)
-    )
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 @router.post(
@@ -414,3 +526,42 @@ async def get_job_result(job_id: str):
         job_id=job_id,
         result=job.result
     )
+
+
+@router.get(
+    "/jobs/{job_id}/audio",
+    summary="Descargar el audio de un job completado",
+    description="""
+    Devuelve el audio de un job completado como binario, sin codificación base64.
+    Solo disponible para jobs creados con `"binary_output": true` en request_data;
+    el resto incluye el audio en base64 en /jobs/{job_id}/result.
+    """,
+    tags=["Async Jobs"]
+)
+async def get_job_audio(job_id: str):
+    """
+    Descarga el audio binario de un job completado.
+    """
+    job = job_manager.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job no encontrado: {job_id}")
+    
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El job no está completado. Estado actual: {job.status.value}"
+        )
+    
+    audio = job.audio_bytes
+    if audio is None:
+        raise HTTPException(
+            status_code=400,
+            detail="El job no se creó con binary_output; el audio está en /jobs/{job_id}/result"
+        )
+    
+    output_format = job.request_data.get("output_format", "wav")
+    return Response(
+        content=audio,
+        media_type=AUDIO_MEDIA_TYPES.get(output_format, "application/octet-stream")
+    )
@@ -0,0 +1,88 @@
+"""
+Clases de respuesta personalizadas para la API.
+"""
+
+from decimal import Decimal
+from pathlib import PurePath
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.schemas.requests import BaseSchema
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Serializa los tipos que orjson no soporta de forma nativa."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, PurePath):
+        return str(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+class ORJSONResp(JSONResponse):
+    """
+    Respuesta JSON por defecto de la aplicación, renderizada con orjson.
+    
+    orjson ya cubre datetime, UUID, dataclasses y arrays de numpy; _orjson_default
+    añade Decimal, sets, rutas y modelos Pydantic anidados en dicts.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+
+class PydanticResponse(JSONResponse):
+    """
+    Respuesta JSON que serializa un modelo Pydantic directamente con model_dump_json.
+    
+    Al devolver esta respuesta desde un endpoint, FastAPI no pasa el contenido por
+    jsonable_encoder ni vuelve a validarlo contra response_model; el serializador de
+    pydantic-core genera los bytes en una sola pasada (omitiendo campos None en los
+    modelos BaseSchema). El response_model del decorador se mantiene para la
+    documentación OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseSchema):
+            return content.to_json()
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(by_alias=True).encode("utf-8")
+        return super().render(content)
+
+
+class HealthTemplate:
+    """
+    Plantilla JSON precalculada para los health checks.
+    
+    Los campos fijos (cuda_available, cache_dir) se serializan una sola vez; en cada
+    petición solo se sustituyen status, timestamp y models_ready sobre los bytes.
+    """
+
+    def __init__(self, cuda_available: bool, cache_dir: str):
+        self._template = orjson.dumps({
+            "status": "__S__",
+            "timestamp": "__TS__",
+            "cuda_available": cuda_available,
+            "models_ready": "__READY__",
+            "cache_dir": cache_dir
+        })
+
+    def render(self, status: str, timestamp: float, models_ready: bool) -> bytes:
+        """Genera el JSON de HealthResponse con los valores actuales."""
+        return (
+            self._template
+            .replace(b'"__S__"', orjson.dumps(status))
+            .replace(b'"__TS__"', repr(timestamp).encode())
+            .replace(b'"__READY__"', b"true" if models_ready else b"false")
+        )
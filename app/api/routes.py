@@ -3,12 +3,17 @@ API Routes - Endpoints REST para Qwen3-TTS Service
 """
 
 import os
+import functools
 import time
+import secrets
 import logging
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Request
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response
+from pydantic import TypeAdapter
+
+from app.api.responses import PydanticResponse, HealthTemplate
 
 from app.schemas.requests import (
     CustomVoiceRequest,
@@ -19,6 +24,7 @@ from app.schemas.requests import (
     ModelsInfoResponse,
     CreateClonedVoiceRequest,
     UpdateClonedVoiceRequest,
+    ClonedVoiceInfo,
     ClonedVoiceListResponse,
     ClonedVoiceDetailResponse,
     ClonedVoiceCreateResponse,
@@ -31,6 +37,7 @@ from app.schemas.requests import (
     SpeakersResponse,
     LanguagesResponse,
     ModelsStatusResponse,
+    ModelsStatusResponseV2,
     DownloadModelResponse,
     AVAILABLE_SPEAKERS,
     SUPPORTED_LANGUAGES,
@@ -38,22 +45,168 @@ from app.schemas.requests import (
     OUTPUT_FORMATS
 )
 
-from app.services.voice_manager import VoiceManager
 from app.services.model_manager import get_model_manager
+from app.services.response_cache import ResponseCache
 
 # Usar dependencias globales
-from app.dependencies import get_tts_service
+from app.dependencies import get_tts_service, get_voice_manager
+from app.services.job_processors import job_result_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+# Endpoints de la versión 2 de la API (montados bajo /api/v2)
+v2_router = APIRouter()
 
 # Directorio para archivos de salida
 OUTPUT_DIR = "/app/output"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Los audios guardados para /audio/{audio_id} se borran pasado este tiempo (segundos)
+AUDIO_FILE_TTL = float(os.getenv("TTS_AUDIO_TTL", "3600"))
+_AUDIO_SWEEP_INTERVAL = 60.0
+_last_audio_sweep = 0.0
+
 # ModelManager para gestión de descargas
 model_manager = get_model_manager()
 
+# Caché de respuestas de /tts/cloned-voice/generate (misma voz, texto y parámetros)
+cloned_voice_cache = ResponseCache(
+    max_size=int(os.getenv("TTS_CACHE_SIZE", "128")),
+    ttl_seconds=float(os.getenv("TTS_CACHE_TTL", "600")),
+    max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "128")) * 1024 * 1024)
+)
+
+# Plantilla del health check (se crea en la primera petición)
+_health_template: Optional[HealthTemplate] = None
+
+# Información de los speakers preestablecidos
+SPEAKER_DETAILS = {
+    "Vivian": {"gender": "Female", "language": "Chinese", "style": "Natural"},
+    "Serena": {"gender": "Female", "language": "English", "style": "Professional"},
+    "Uncle_Fu": {"gender": "Male", "language": "Chinese", "style": "Mature"},
+    "Dylan": {"gender": "Male", "language": "English", "style": "Young"},
+    "Eric": {"gender": "Male", "language": "English", "style": "Professional"},
+    "Ryan": {"gender": "Male", "language": "English", "style": "Conversational"},
+    "Aiden": {"gender": "Male", "language": "English", "style": "Versatile"},
+    "Ono_Anna": {"gender": "Female", "language": "Japanese", "style": "Anime"},
+    "Sohee": {"gender": "Female", "language": "Korean", "style": "Natural"}
+}
+
+# Serializador de listas de voces (evita recorrer el modelo contenedor)
+_VOICE_LIST_ADAPTER = TypeAdapter(list[ClonedVoiceInfo])
+
+# Tipos MIME por formato de salida
+AUDIO_MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "ogg": "audio/ogg",
+    "opus": "audio/ogg"
+}
+
+
+def _sweep_stored_audio():
+    """Borra los audios tts_* de OUTPUT_DIR con más de AUDIO_FILE_TTL segundos."""
+    global _last_audio_sweep
+    now = time.time()
+    if now - _last_audio_sweep < _AUDIO_SWEEP_INTERVAL:
+        return
+    _last_audio_sweep = now
+    
+    removed = 0
+    with os.scandir(OUTPUT_DIR) as entries:
+        for entry in entries:
+            if not entry.name.startswith("tts_"):
+                continue
+            try:
+                if now - entry.stat().st_mtime > AUDIO_FILE_TTL:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass  # Borrado por otra petición concurrente
+    if removed:
+        logger.info(f"Audios caducados eliminados: {removed}")
+
+
+def _store_audio(audio_bytes: bytes, output_format: str) -> str:
+    """
+    Guarda el audio generado en OUTPUT_DIR para servirlo por /audio/{audio_id}.
+    Aprovecha para borrar los audios caducados (como mucho una vez por minuto).
+    
+    Returns:
+        ID del audio (nombre del archivo)
+    """
+    _sweep_stored_audio()
+    audio_id = f"tts_{secrets.token_hex(16)}.{output_format}"
+    with open(os.path.join(OUTPUT_DIR, audio_id), "wb") as f:
+        f.write(audio_bytes)
+    return audio_id
+
+
+def _make_tts_response(tts_service, audio_result, output_format: str, inline: bool, start_time: float) -> TTSResponse:
+    """
+    Construye el TTSResponse de una generación exitosa.
+    Con inline=True el audio va en audio_base64; con inline=False se guarda en disco y
+    solo se devuelve audio_url, evitando el coste de base64 (+33% de bytes) en el JSON.
+    """
+    if inline:
+        audio_base64 = tts_service.audio_to_base64(audio_result, output_format)
+        audio_url = None
+    else:
+        audio_base64 = None
+        audio_id = _store_audio(tts_service.audio_to_bytes(audio_result, output_format), output_format)
+        audio_url = f"/api/v1/audio/{audio_id}"
+    
+    return TTSResponse(
+        success=True,
+        audio_base64=audio_base64,
+        audio_url=audio_url,
+        sample_rate=audio_result.sample_rate,
+        duration_seconds=audio_result.duration_seconds,
+        model_used=audio_result.model_used,
+        processing_time_seconds=time.time() - start_time
+    )
+
+
+def _build_tts_response(tts_service, audio_result, output_format: str, inline: bool, start_time: float) -> PydanticResponse:
+    """Construye la respuesta (TTSResponse ya serializado) de una generación exitosa."""
+    return PydanticResponse(_make_tts_response(tts_service, audio_result, output_format, inline, start_time))
+
+
+@functools.cache
+def _speakers_payload_bytes() -> bytes:
+    """JSON de /speakers: datos estáticos, se serializa una sola vez."""
+    return SpeakersResponse(
+        speakers=AVAILABLE_SPEAKERS,
+        details={k: v for k, v in SPEAKER_DETAILS.items() if k in AVAILABLE_SPEAKERS}
+    ).to_json()
+
+
+@functools.cache
+def _languages_payload_bytes() -> bytes:
+    """JSON de /languages: datos estáticos, se serializa una sola vez."""
+    return LanguagesResponse(
+        languages=SUPPORTED_LANGUAGES,
+        notes="Use 'Auto' para detección automática del idioma"
+    ).to_json()
+
+
+async def _fetch_ref_audio(url: str) -> bytes:
+    """Descarga un audio de referencia sin bloquear el event loop."""
+    import httpx
+    
+    logger.info(f"Descargando audio desde: {url}")
+    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.content
+
+
+def _cached_audio_available(response: TTSResponse) -> bool:
+    """Comprueba que el audio referenciado por una respuesta cacheada sigue en disco."""
+    if response.audio_url is None:
+        return True
+    return os.path.isfile(os.path.join(OUTPUT_DIR, os.path.basename(response.audio_url)))
+
 
 # ============================================================
 # ENDPOINTS - ESTADO Y PROGRESO DE MODELOS
@@ -76,6 +229,30 @@ async def get_models_status():
     }
 
 
+@v2_router.get(
+    "/models/status",
+    response_model=ModelsStatusResponseV2,
+    summary="Estado de todos los modelos (columnar)",
+    description="Igual que /api/v1/models/status, pero con una lista por campo en lugar de un objeto por modelo.",
+    tags=["Models"]
+)
+async def get_models_status_v2():
+    """
+    Retorna el estado de todos los modelos en formato struct-of-arrays.
+    """
+    statuses = model_manager.get_all_models_status()
+    
+    return PydanticResponse(ModelsStatusResponseV2.model_construct(
+        model_ids=[st["repo_id"] for st in statuses],
+        model_sizes=[st["model_size"] for st in statuses],
+        model_types=[st["model_type"] for st in statuses],
+        installed=[st["installed"] for st in statuses],
+        paths=[st.get("path") for st in statuses],
+        index={f"{st['model_size']}/{st['model_type']}": i for i, st in enumerate(statuses)},
+        cache_dir=str(model_manager.cache_dir)
+    ))
+
+
 @router.get(
     "/models/status/{model_size}/{model_type}",
     response_model=dict,
@@ -139,18 +316,23 @@ async def health_check():
     """
     Health check del servicio.
     """
-    import torch
+    global _health_template
+    if _health_template is None:
+        import torch
+        _health_template = HealthTemplate(
+            cuda_available=torch.cuda.is_available(),
+            cache_dir=str(model_manager.cache_dir)
+        )
     
     # Verificar si los modelos esenciales están disponibles
     voice_clone_status = model_manager.get_model_status("1.7B", "voice_clone")
     
-    return {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "cuda_available": torch.cuda.is_available(),
-        "models_ready": voice_clone_status["installed"],
-        "cache_dir": str(model_manager.cache_dir)
-    }
+    content = _health_template.render(
+        status="healthy",
+        timestamp=time.time(),
+        models_ready=voice_clone_status["installed"]
+    )
+    return Response(content=content, media_type="application/json")
 
 
 # ============================================================
@@ -194,19 +376,7 @@ async def generate_custom_voice(request: CustomVoiceRequest):
             generation_params=request.to_generation_kwargs()
         )
         
-        # Convertir a base64
-        audio_base64 = tts_service.audio_to_base64(audio_result, request.output_format)
-        
-        processing_time = time.time() - start_time
-        
-        return TTSResponse(
-            success=True,
-            audio_base64=audio_base64,
-            sample_rate=audio_result.sample_rate,
-            duration_seconds=audio_result.duration_seconds,
-            model_used=audio_result.model_used,
-            processing_time_seconds=processing_time
-        )
+        return _build_tts_response(tts_service, audio_result, request.output_format, request.inline, start_time)
         
     except Exception as e:
         logger.error(f"Error en custom voice: {e}")
@@ -218,6 +388,43 @@ async def generate_custom_voice(request: CustomVoiceRequest):
         )
 
 
+@router.post(
+    "/tts/raw",
+    summary="Generar voz preestablecida y devolver el audio binario",
+    description="""
+    Igual que /tts/custom, pero responde directamente con el audio (audio/wav, audio/mpeg...)
+    en lugar de un JSON. Pensado para clientes que necesitan los bytes en la misma petición
+    sin pasar por base64.
+    """,
+    tags=["Text-to-Speech"],
+    responses={200: {"description": "Audio binario"}}
+)
+async def generate_custom_voice_raw(request: CustomVoiceRequest):
+    """
+    Genera voz con un personaje preestablecido y devuelve el audio binario.
+    """
+    tts_service = get_tts_service()
+    
+    try:
+        audio_result = tts_service.generate_custom_voice(
+            text=request.text,
+            speaker=request.speaker,
+            language=request.language,
+            instruction=request.instruction,
+            generation_params=request.to_generation_kwargs()
+        )
+        audio_bytes = tts_service.audio_to_bytes(audio_result, request.output_format)
+    except Exception as e:
+        logger.error(f"Error en custom voice (raw): {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    # El audio ya está entero en memoria: se envía en un solo cuerpo
+    return Response(
+        content=audio_bytes,
+        media_type=AUDIO_MEDIA_TYPES.get(request.output_format, "application/octet-stream")
+    )
+
+
 # ============================================================
 # ENDPOINTS - VOICE DESIGN
 # ============================================================
@@ -259,19 +466,7 @@ async def generate_voice_design(request: VoiceDesignRequest):
             generation_params=request.to_generation_kwargs()
         )
         
-        # Convertir a base64
-        audio_base64 = tts_service.audio_to_base64(audio_result, request.output_format)
-        
-        processing_time = time.time() - start_time
-        
-        return TTSResponse(
-            success=True,
-            audio_base64=audio_base64,
-            sample_rate=audio_result.sample_rate,
-            duration_seconds=audio_result.duration_seconds,
-            model_used=audio_result.model_used,
-            processing_time_seconds=processing_time
-        )
+        return _build_tts_response(tts_service, audio_result, request.output_format, request.inline, start_time)
         
     except Exception as e:
         logger.error(f"Error en voice design: {e}")
@@ -322,19 +517,7 @@ async def clone_voice_from_url(request: VoiceCloneRequest):
             generation_params=request.to_generation_kwargs()
         )
         
-        # Convertir a base64
-        audio_base64 = tts_service.audio_to_base64(audio_result, request.output_format)
-        
-        processing_time = time.time() - start_time
-        
-        return TTSResponse(
-            success=True,
-            audio_base64=audio_base64,
-            sample_rate=audio_result.sample_rate,
-            duration_seconds=audio_result.duration_seconds,
-            model_used=audio_result.model_used,
-            processing_time_seconds=processing_time
-        )
+        return _build_tts_response(tts_service, audio_result, request.output_format, request.inline, start_time)
         
     except Exception as e:
         logger.error(f"Error en voice clone URL: {e}")
@@ -364,6 +547,7 @@ async def clone_voice_from_upload(
     language: str = Form(default="Spanish", description="Idioma del texto"),
     output_format: str = Form(default="wav", description="Formato de salida"),
     model_size: str = Form(default="1.7B", description="Tamaño del modelo (0.6B o 1.7B)"),
+    inline: bool = Form(default=False, description="Incluir el audio en base64 (True) o solo audio_url (False)"),
     ref_audio: UploadFile = File(..., description="Archivo de audio de referencia")
 ):
     """
@@ -396,19 +580,7 @@ async def clone_voice_from_upload(
             model_size=model_size
         )
         
-        # Convertir a base64
-        audio_base64 = tts_service.audio_to_base64(audio_result, output_format)
-        
-        processing_time = time.time() - start_time
-        
-        return TTSResponse(
-            success=True,
-            audio_base64=audio_base64,
-            sample_rate=audio_result.sample_rate,
-            duration_seconds=audio_result.duration_seconds,
-            model_used=audio_result.model_used,
-            processing_time_seconds=processing_time
-        )
+        return _build_tts_response(tts_service, audio_result, output_format, inline, start_time)
         
     except HTTPException:
         raise
@@ -478,22 +650,7 @@ async def get_speakers():
     """
     Lista speakers disponibles.
     """
-    speaker_info = {
-        "Vivian": {"gender": "Female", "language": "Chinese", "style": "Natural"},
-        "Serena": {"gender": "Female", "language": "English", "style": "Professional"},
-        "Uncle_Fu": {"gender": "Male", "language": "Chinese", "style": "Mature"},
-        "Dylan": {"gender": "Male", "language": "English", "style": "Young"},
-        "Eric": {"gender": "Male", "language": "English", "style": "Professional"},
-        "Ryan": {"gender": "Male", "language": "English", "style": "Conversational"},
-        "Aiden": {"gender": "Male", "language": "English", "style": "Versatile"},
-        "Ono_Anna": {"gender": "Female", "language": "Japanese", "style": "Anime"},
-        "Sohee": {"gender": "Female", "language": "Korean", "style": "Natural"}
-    }
-    
-    return {
-        "speakers": AVAILABLE_SPEAKERS,
-        "details": {k: v for k, v in speaker_info.items() if k in AVAILABLE_SPEAKERS}
-    }
+    return Response(content=_speakers_payload_bytes(), media_type="application/json")
 
 
 @router.get(
@@ -507,10 +664,7 @@ async def get_languages():
     """
     Lista idiomas soportados.
     """
-    return {
-        "languages": SUPPORTED_LANGUAGES,
-        "notes": "Use 'Auto' para detección automática del idioma"
-    }
+    return Response(content=_languages_payload_bytes(), media_type="application/json")
 
 
 @router.post(
@@ -603,12 +757,47 @@ async def download_file(filename: str):
     )
 
 
+@router.get(
+    "/audio/{audio_id}",
+    summary="Obtener audio generado (binario)",
+    description="""
+    Devuelve el audio de una generación hecha con inline=False.
+    El archivo se envía en streaming como binario, sin codificación base64.
+    Los audios se conservan TTS_AUDIO_TTL segundos (1 hora por defecto).
+    """,
+    tags=["Utilities"],
+    responses={
+        200: {
+            "description": "Audio binario",
+            "content": {media_type: {"schema": {"type": "string", "format": "binary"}}
+                        for media_type in set(AUDIO_MEDIA_TYPES.values())}
+        },
+        404: {"description": "Audio no encontrado"}
+    }
+)
+async def get_audio(audio_id: str):
+    """
+    Sirve el audio generado en streaming.
+    """
+    # basename evita path traversal fuera de OUTPUT_DIR
+    file_path = os.path.join(OUTPUT_DIR, os.path.basename(audio_id))
+    
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Audio no encontrado")
+    
+    extension = os.path.splitext(file_path)[1].lstrip(".").lower()
+    return FileResponse(
+        path=file_path,
+        media_type=AUDIO_MEDIA_TYPES.get(extension, "application/octet-stream")
+    )
+
+
 # ============================================================
 # ENDPOINTS - GESTIÓN DE VOCES CLONADAS PERSISTENTES
 # ============================================================
 
-# Instancia global del VoiceManager
-voice_manager = VoiceManager(storage_dir="/app/data")
+# Instancia global del VoiceManager (compartida con los procesadores de jobs)
+voice_manager = get_voice_manager()
 
 
 @router.post(
@@ -633,22 +822,34 @@ async def create_cloned_voice(request: CreateClonedVoiceRequest):
         audio_bytes_to_save = None
         temp_file_path = None
         
-        # Si es data URL base64, guardar temporalmente y extraer bytes
-        if ref_audio_url.startswith("data:audio") and ";base64," in ref_audio_url:
+        # Comprobar el nombre antes de descargar y cargar el modelo (create_voice lo vuelve a verificar)
+        voice_id = voice_manager.sanitize_voice_id(request.name)
+        if voice_id in voice_manager.voices:
+            raise ValueError(f"Ya existe una voz con el ID '{voice_id}'. Use un nombre diferente o elimine la voz existente primero.")
+        generation_params = request.to_generation_kwargs()
+        
+        if ref_audio_url.startswith("http"):
+            # Descarga asíncrona: no bloquea el event loop
+            audio_bytes_to_save = await _fetch_ref_audio(ref_audio_url)
+            logger.info(f"Audio de referencia descargado: {len(audio_bytes_to_save)} bytes")
+        elif ref_audio_url.startswith("data:audio") and ";base64," in ref_audio_url:
+            # Si es data URL base64, extraer los bytes
             logger.info("Detectado data URL base64, procesando...")
             import base64
-            import tempfile
             
             # Extraer la parte base64
             base64_data = ref_audio_url.split(";base64,")[1]
             audio_bytes_to_save = base64.b64decode(base64_data)
+        
+        if audio_bytes_to_save is not None:
+            import tempfile
             
             # Guardar temporalmente para crear el prompt
             with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
                 tmp.write(audio_bytes_to_save)
                 temp_file_path = tmp.name
                 ref_audio_url = tmp.name
-                logger.info(f"Audio base64 guardado temporalmente en: {ref_audio_url}")
+                logger.info(f"Audio de referencia guardado temporalmente en: {ref_audio_url}")
         
         # Crear el prompt de clonación
         prompt_id = tts_service.create_voice_clone_prompt(
@@ -670,7 +871,7 @@ async def create_cloned_voice(request: CreateClonedVoiceRequest):
             ref_text=request.ref_text,
             language=request.language,
             prompt_data=prompt_data,
-            generation_params=request.to_generation_kwargs(),
+            generation_params=generation_params,
             ref_audio_bytes=audio_bytes_to_save  # Pasar los bytes para que se guarden
         )
         
@@ -706,11 +907,17 @@ async def list_cloned_voices():
     """
     Lista todas las voces clonadas guardadas.
     """
-    voices = voice_manager.list_voices()
-    return {
-        "voices": voices,
-        "total": len(voices)
-    }
+    # Datos propios del VoiceManager: se construyen sin validar
+    voices = [ClonedVoiceInfo.model_construct(**voice) for voice in voice_manager.list_voices()]
+    # Mismo JSON que ClonedVoiceListResponse, serializando la lista en una sola llamada
+    body = b''.join((
+        b'{"voices":',
+        _VOICE_LIST_ADAPTER.dump_json(voices, by_alias=True, exclude_none=True),
+        b',"total":',
+        str(len(voices)).encode(),
+        b'}'
+    ))
+    return Response(content=body, media_type="application/json")
 
 
 @router.get(
@@ -754,6 +961,10 @@ async def update_cloned_voice(voice_id: str, request: UpdateClonedVoiceRequest):
     if not voice:
         raise HTTPException(status_code=404, detail=f"Voz no encontrada: {voice_id}")
     
+    # Los parámetros por defecto pueden haber cambiado
+    cloned_voice_cache.invalidate_tag(voice_id)
+    job_result_cache.invalidate_tag(voice_id)
+    
     return {
         "success": True,
         "voice": voice.to_dict(),
@@ -777,6 +988,9 @@ async def delete_cloned_voice(voice_id: str):
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Voz no encontrada: {voice_id}")
     
+    cloned_voice_cache.invalidate_tag(voice_id)
+    job_result_cache.invalidate_tag(voice_id)
+    
     return {
         "success": True,
         "message": f"Voz '{voice_id}' eliminada exitosamente"
@@ -818,6 +1032,13 @@ async def generate_from_cloned_voice(request: GenerateFromClonedVoiceRequest):
                        f"Cree la voz primero con POST /cloned-voices"
             )
         
+        # Petición repetida: devolver el audio ya generado
+        cache_key = request.request_hash
+        cached = cloned_voice_cache.get(cache_key)
+        if cached is not None and _cached_audio_available(cached):
+            logger.info(f"=== FIN generate_from_cloned_voice - CACHÉ ===")
+            return PydanticResponse(cached.model_copy(update={"processing_time_seconds": 0.0}))
+        
         prompt_data = voice_manager.get_prompt(request.voice_id)
         logger.info(f"Prompt data encontrado: {prompt_data is not None}")
         logger.info(f"Tipo de prompt_data: {type(prompt_data)}")
@@ -879,21 +1100,17 @@ async def generate_from_cloned_voice(request: GenerateFromClonedVoiceRequest):
         tts_service._immediate_cleanup()
         logger.info("Limpieza completada")
         
-        # Crear un prompt_id temporal para reusar el prompt existente
-        temp_prompt_id = f"temp_{request.voice_id}_{int(time.time())}"
-        logger.info(f"Temp prompt ID: {temp_prompt_id}")
-        
-        tts_service._voice_clone_prompts[temp_prompt_id] = prompt_data
-        logger.info(f"Prompt guardado en servicio. Total prompts: {len(tts_service._voice_clone_prompts)}")
-        
-        try:
+        # Registrar el prompt existente con un id temporal único; se libera al salir del bloque
+        with tts_service.register_prompt(prompt_data, prefix=f"temp_{request.voice_id}") as temp_prompt_id:
+            logger.info(f"Temp prompt ID: {temp_prompt_id}")
+            
             # Determinar parámetros de generación
             logger.info(f"Request use_voice_defaults: {request.use_voice_defaults}")
             logger.info(f"Voice generation_params: {voice.generation_params}")
             
             if request.use_voice_defaults and voice.generation_params:
-                # Usar los parámetros guardados con la voz
-                generation_params = voice.generation_params
+                # Usar los parámetros guardados con la voz (copia: el modelo no debe mutarlos)
+                generation_params = dict(voice.generation_params)
                 logger.info(f"✅ Usando parámetros GUARDADOS con la voz: {generation_params}")
             else:
                 # Usar los parámetros de esta petición
@@ -911,29 +1128,16 @@ async def generate_from_cloned_voice(request: GenerateFromClonedVoiceRequest):
             )
             logger.info(f"Audio generado exitosamente: {audio_result.duration_seconds}s")
             
-            # Convertir a base64
-            logger.info("Convirtiendo a base64...")
-            audio_base64 = tts_service.audio_to_base64(audio_result, request.output_format)
-            logger.info("Conversión completada")
-            
-            processing_time = time.time() - start_time
-            logger.info(f"=== FIN generate_from_cloned_voice - ÉXITO ===")
-            
-            return TTSResponse(
-                success=True,
-                audio_base64=audio_base64,
-                sample_rate=audio_result.sample_rate,
-                duration_seconds=audio_result.duration_seconds,
-                model_used=audio_result.model_used,
-                processing_time_seconds=processing_time
+            logger.info("Codificando audio...")
+            response = _make_tts_response(
+                tts_service, audio_result, request.output_format, request.inline, start_time
             )
+            cloned_voice_cache.set(
+                cache_key, response, tag=request.voice_id, size=len(response.audio_base64 or "")
+            )
+            logger.info(f"=== FIN generate_from_cloned_voice - ÉXITO ===")
             
-        finally:
-            # Limpiar prompt temporal
-            logger.info("Limpiando prompt temporal...")
-            if temp_prompt_id in tts_service._voice_clone_prompts:
-                del tts_service._voice_clone_prompts[temp_prompt_id]
-                logger.info("Prompt temporal eliminado")
+            return PydanticResponse(response)
         
     except HTTPException:
         logger.error("HTTPException capturada")
@@ -3,10 +3,14 @@ Dependencies - Gestión de dependencias globales
 """
 import os
 from app.services.tts_service import TTSService
+from app.services.voice_manager import VoiceManager
 
 # Singleton global del servicio TTS
 _tts_service = None
 
+# Singleton global del gestor de voces clonadas
+_voice_manager = None
+
 def get_tts_service() -> TTSService:
     """Obtiene o inicializa el servicio TTS (singleton)."""
     global _tts_service
@@ -15,3 +19,11 @@ def get_tts_service() -> TTSService:
         cache_dir = os.getenv("HF_HOME", "/app/models")
         _tts_service = TTSService(cache_dir=cache_dir)
     return _tts_service
+
+
+def get_voice_manager() -> VoiceManager:
+    """Obtiene o inicializa el gestor de voces clonadas (singleton compartido por rutas y jobs)."""
+    global _voice_manager
+    if _voice_manager is None:
+        _voice_manager = VoiceManager(storage_dir=os.getenv("VOICE_STORAGE_DIR", "/app/data"))
+    return _voice_manager
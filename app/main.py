@@ -10,10 +10,11 @@ from contextlib import asynccontextmanager
 import torch
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 
+from app.api.responses import ORJSONResp, HealthTemplate
 from app.schemas.requests import RootResponse, HealthResponse
 
 # Configuración de logging
@@ -51,10 +52,15 @@ async def lifespan(app: FastAPI):
         logger.error(f"Error al inicializar el servicio TTS: {e}")
         raise
     
+    # Generar el esquema OpenAPI una sola vez al arrancar; FastAPI lo cachea en app.openapi_schema
+    app.openapi()
+    
     yield
     
     # Cleanup
     logger.info("Cerrando Qwen3-TTS Service...")
+    from app.services.job_manager import job_manager
+    await job_manager.shutdown()
 
 
 # Crear aplicación FastAPI
@@ -65,9 +71,21 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    # orjson serializa en C: relevante para respuestas grandes como TTSResponse.audio_base64
+    default_response_class=ORJSONResp,
     lifespan=lifespan
 )
 
+# Respuestas constantes serializadas una sola vez
+_ROOT_BYTES = RootResponse(
+    service=APP_TITLE,
+    version=APP_VERSION,
+    status="running",
+    docs="/docs",
+    health="/api/v1/health"
+).to_json()
+_HEALTH_TEMPLATE = HealthTemplate(cuda_available=torch.cuda.is_available(), cache_dir=MODEL_CACHE_DIR)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -78,11 +96,12 @@ app.add_middleware(
 )
 
 # Importar y registrar rutas
-from app.api.routes import router as api_router
+from app.api.routes import router as api_router, v2_router as api_v2_router
 from app.api.jobs_routes import router as jobs_router
 
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(jobs_router, prefix="/api/v1")
+app.include_router(api_v2_router, prefix="/api/v2")
 
 # Configurar archivos estáticos para la interfaz web
 if os.path.exists("/app/web"):
@@ -99,13 +118,7 @@ if os.path.exists("/app/web"):
 )
 async def root():
     """Endpoint raíz con información básica del servicio."""
-    return {
-        "service": APP_TITLE,
-        "version": APP_VERSION,
-        "status": "running",
-        "docs": "/docs",
-        "health": "/api/v1/health"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 @app.get(
@@ -120,15 +133,13 @@ async def health_check():
     from app.dependencies import get_tts_service
     
     tts_service = get_tts_service()
-    health_status = {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "cuda_available": torch.cuda.is_available(),
-        "models_ready": len(tts_service.get_loaded_models()) > 0,
-        "cache_dir": MODEL_CACHE_DIR
-    }
+    content = _HEALTH_TEMPLATE.render(
+        status="healthy",
+        timestamp=time.time(),
+        models_ready=len(tts_service.get_loaded_models()) > 0
+    )
     
-    return health_status
+    return Response(content=content, media_type="application/json")
 
 
 @app.exception_handler(Exception)
@@ -0,0 +1,22 @@
+"""
+Ejemplos largos para la documentación OpenAPI.
+
+Este módulo solo se importa cuando se genera el esquema JSON (p. ej. al abrir /docs),
+de forma que los textos de ejemplo no quedan residentes en los metadatos de los modelos.
+"""
+
+CUSTOM_VOICE_TEXT = "¡Hola! Esta es una demostración de Qwen3-TTS."
+
+VOICE_DESIGN_TEXT = "No puedo creer que finalmente llegamos a la cima de la montaña."
+
+VOICE_DESCRIPTION = """gender: Male
+pitch: Deep and resonant with subtle downward inflections
+speed: Deliberately slow with extended pauses
+volume: Moderate to soft
+age: Middle-aged to older adult
+emotion: Contemplative and intriguing
+tone: Mysterious and atmospheric"""
+
+VOICE_CLONE_TEXT = "Esto es lo que sucede cuando clonas una voz."
+
+VOICE_CLONE_REF_TEXT = "Hola, esta es una prueba de mi voz..."
@@ -2,8 +2,23 @@
 Pydantic models for API requests and responses.
 """
 
-from typing import Optional, Literal, List, Dict, Any, Union
-from pydantic import BaseModel, Field, validator
+import sys
+import hashlib
+from functools import cached_property
+from typing import Annotated, Optional, Literal, List, Dict, Any, Union
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, TypeAdapter, computed_field, field_validator
+
+
+def _lazy_example(name: str):
+    """
+    Devuelve un callable para json_schema_extra que inyecta un ejemplo de app.schemas.examples.
+    El módulo de ejemplos solo se importa al generar el esquema OpenAPI.
+    """
+    def _apply(schema: dict) -> None:
+        from app.schemas import examples
+        schema["examples"] = [getattr(examples, name)]
+    return _apply
+
 
 # ============================================================
 # ENUMERACIONES Y CONSTANTES
@@ -23,6 +38,44 @@ MODEL_SIZES = ["0.6B", "1.7B"]
 
 OUTPUT_FORMATS = ["wav", "mp3", "ogg", "opus"]
 
+JOB_TYPES = ["custom_voice", "voice_design", "voice_clone_url", "voice_clone_file", "cloned_voice_generate"]
+
+# Sufijos de error precalculados: evita formatear la lista completa en cada validación fallida
+_SPEAKER_ERR_SUFFIX = f"Opciones: {AVAILABLE_SPEAKERS}"
+_LANG_ERR_SUFFIX = f"Opciones: {SUPPORTED_LANGUAGES}"
+_MODEL_ERR_SUFFIX = f"Opciones: {MODEL_SIZES}"
+_FMT_ERR_SUFFIX = f"Opciones: {OUTPUT_FORMATS}"
+_JOB_TYPE_ERR_SUFFIX = f"Opciones: {JOB_TYPES}"
+
+
+def _choice_validator(name: str, choices: List[str], error_prefix: str, error_suffix: str):
+    """
+    Genera (una vez, al importar) un validador de opciones fijas.
+    Las opciones quedan como un set literal en el código generado, que CPython compila
+    como una constante frozenset: la comprobación es un único CONTAINS_OP sin lookups.
+    """
+    src = (
+        f"def {name}(v):\n"
+        f"    if v not in {set(choices)!r}:\n"
+        f"        raise ValueError(f{error_prefix!r} + {error_suffix!r})\n"
+        f"    return v\n"
+    )
+    namespace = {}
+    exec(compile(src, f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+SpeakerName = Annotated[str, AfterValidator(_choice_validator(
+    "validate_speaker", AVAILABLE_SPEAKERS, "Speaker '{v}' no disponible. ", _SPEAKER_ERR_SUFFIX))]
+LanguageName = Annotated[str, AfterValidator(_choice_validator(
+    "validate_language", SUPPORTED_LANGUAGES, "Idioma '{v}' no soportado. ", _LANG_ERR_SUFFIX))]
+OutputFormatName = Annotated[str, AfterValidator(_choice_validator(
+    "validate_format", OUTPUT_FORMATS, "Formato '{v}' no soportado. ", _FMT_ERR_SUFFIX))]
+ModelSizeName = Annotated[str, AfterValidator(_choice_validator(
+    "validate_model_size", MODEL_SIZES, "Tamaño de modelo '{v}' no válido. ", _MODEL_ERR_SUFFIX))]
+JobTypeName = Annotated[str, AfterValidator(_choice_validator(
+    "validate_job_type", JOB_TYPES, "Tipo de job '{v}' no válido. ", _JOB_TYPE_ERR_SUFFIX))]
+
 # ============================================================
 # PARÁMETROS DE GENERACIÓN COMUNES
 # ============================================================
@@ -37,28 +90,28 @@ class GenerationParams(BaseModel):
         ge=0.1,
         le=2.0,
         description="Controla la creatividad/aleatoriedad de la generación. Valores más bajos = más determinístico, valores más altos = más variado",
-        example=0.9
+        examples=[0.9]
     )
     top_p: float = Field(
         default=1.0,
         ge=0.0,
         le=1.0,
         description="Nucleus sampling. Filtra tokens considerando solo los que acumulan hasta top_p de probabilidad",
-        example=0.95
+        examples=[0.95]
     )
     top_k: int = Field(
         default=50,
         ge=1,
         le=100,
         description="Top-k sampling. Considera solo los k tokens más probables",
-        example=50
+        examples=[50]
     )
     repetition_penalty: float = Field(
         default=1.05,
         ge=1.0,
         le=2.0,
         description="Penaliza la repetición de tokens. 1.0 = sin penalización, valores más altos = menos repetición",
-        example=1.05
+        examples=[1.05]
     )
     do_sample: bool = Field(
         default=True,
@@ -69,7 +122,7 @@ class GenerationParams(BaseModel):
         ge=100,
         le=8192,
         description="Número máximo de tokens a generar",
-        example=4096
+        examples=[4096]
     )
     
     # Parámetros específicos del subtalker (para control de prosodia)
@@ -78,21 +131,21 @@ class GenerationParams(BaseModel):
         ge=0.1,
         le=2.0,
         description="Temperature específico para el subtalker (control de prosodia)",
-        example=0.9
+        examples=[0.9]
     )
     subtalker_top_p: float = Field(
         default=1.0,
         ge=0.0,
         le=1.0,
         description="Top-p específico para el subtalker",
-        example=0.95
+        examples=[0.95]
     )
     subtalker_top_k: int = Field(
         default=50,
         ge=1,
         le=100,
         description="Top-k específico para el subtalker",
-        example=50
+        examples=[50]
     )
     subtalker_dosample: bool = Field(
         default=True,
@@ -114,6 +167,32 @@ class GenerationParams(BaseModel):
             "subtalker_dosample": self.subtalker_dosample,
         }
 
+def intern_keys(params: dict) -> dict:
+    """
+    Devuelve una copia del dict con las claves internadas.
+    Los dicts que vienen de JSON no tienen claves internadas; al expandirlos como **kwargs
+    hacia el modelo, las claves internadas se resuelven por comparación de punteros.
+    """
+    return {sys.intern(k): v for k, v in params.items()}
+
+
+# Validador compilado una sola vez por proceso para dicts de parámetros de generación
+_GENERATION_PARAMS_ADAPTER = TypeAdapter(GenerationParams)
+
+
+class HashedRequest(BaseModel):
+    """
+    Base para requests con huella canónica (request_hash).
+    Se usa como clave de caché/deduplicación y para correlacionar logs.
+    """
+    
+    @computed_field(repr=False)
+    @cached_property
+    def request_hash(self) -> str:
+        """Hash BLAKE2b del JSON canónico de la petición (sin el propio hash)."""
+        payload = self.model_dump_json(by_alias=True, exclude={"request_hash"})
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
 # ============================================================
 # REQUESTS - CUSTOM VOICE
 # ============================================================
@@ -128,47 +207,33 @@ class CustomVoiceRequest(GenerationParams):
         min_length=1,
         max_length=1000,
         description="Texto a convertir en voz",
-        example="¡Hola! Esta es una demostración de Qwen3-TTS."
+        json_schema_extra=_lazy_example("CUSTOM_VOICE_TEXT")
     )
-    speaker: str = Field(
+    speaker: SpeakerName = Field(
         ...,
         description="Nombre del personaje preestablecido",
-        example="Sohee"
+        examples=["Sohee"]
     )
-    language: str = Field(
+    language: LanguageName = Field(
         default="Auto",
         description="Idioma del texto (Auto detecta automáticamente)",
-        example="Spanish"
+        examples=["Spanish"]
     )
     instruction: Optional[str] = Field(
         default=None,
         max_length=200,
         description="Instrucción para modificar emoción/estilo (ej: 'Feliz y enérgica')",
-        example="Feliz y enérgica"
+        examples=["Feliz y enérgica"]
     )
-    output_format: str = Field(
+    output_format: OutputFormatName = Field(
         default="wav",
         description="Formato de salida del audio",
-        example="wav"
+        examples=["wav"]
+    )
+    inline: bool = Field(
+        default=False,
+        description="Si True, incluye el audio en audio_base64; si False, solo devuelve audio_url al endpoint binario"
     )
-    
-    @validator('speaker')
-    def validate_speaker(cls, v):
-        if v not in AVAILABLE_SPEAKERS:
-            raise ValueError(f"Speaker '{v}' no disponible. Opciones: {AVAILABLE_SPEAKERS}")
-        return v
-    
-    @validator('language')
-    def validate_language(cls, v):
-        if v not in SUPPORTED_LANGUAGES:
-            raise ValueError(f"Idioma '{v}' no soportado. Opciones: {SUPPORTED_LANGUAGES}")
-        return v
-    
-    @validator('output_format')
-    def validate_format(cls, v):
-        if v not in OUTPUT_FORMATS:
-            raise ValueError(f"Formato '{v}' no soportado. Opciones: {OUTPUT_FORMATS}")
-        return v
 
 
 # ============================================================
@@ -185,43 +250,29 @@ class VoiceDesignRequest(GenerationParams):
         min_length=1,
         max_length=1000,
         description="Texto a convertir en voz",
-        example="No puedo creer que finalmente llegamos a la cima de la montaña."
+        json_schema_extra=_lazy_example("VOICE_DESIGN_TEXT")
     )
     voice_description: str = Field(
         ...,
         min_length=10,
         max_length=2000,
         description="Descripción detallada de la voz deseada en inglés",
-        example="""gender: Male
-pitch: Deep and resonant with subtle downward inflections
-speed: Deliberately slow with extended pauses
-volume: Moderate to soft
-age: Middle-aged to older adult
-emotion: Contemplative and intriguing
-tone: Mysterious and atmospheric"""
+        json_schema_extra=_lazy_example("VOICE_DESCRIPTION")
     )
-    language: str = Field(
+    language: LanguageName = Field(
         default="Spanish",
         description="Idioma del texto a generar",
-        example="Spanish"
+        examples=["Spanish"]
     )
-    output_format: str = Field(
+    output_format: OutputFormatName = Field(
         default="wav",
         description="Formato de salida del audio",
-        example="wav"
+        examples=["wav"]
+    )
+    inline: bool = Field(
+        default=False,
+        description="Si True, incluye el audio en audio_base64; si False, solo devuelve audio_url al endpoint binario"
     )
-    
-    @validator('language')
-    def validate_language(cls, v):
-        if v not in SUPPORTED_LANGUAGES:
-            raise ValueError(f"Idioma '{v}' no soportado. Opciones: {SUPPORTED_LANGUAGES}")
-        return v
-    
-    @validator('output_format')
-    def validate_format(cls, v):
-        if v not in OUTPUT_FORMATS:
-            raise ValueError(f"Formato '{v}' no soportado. Opciones: {OUTPUT_FORMATS}")
-        return v
 
 
 # ============================================================
@@ -238,53 +289,39 @@ class VoiceCloneRequest(GenerationParams):
         min_length=1,
         max_length=1000,
         description="Texto a convertir en voz clonada",
-        example="Esto es lo que sucede cuando clonas una voz."
+        json_schema_extra=_lazy_example("VOICE_CLONE_TEXT")
     )
     ref_audio_url: Optional[str] = Field(
         default=None,
         description="URL del audio de referencia",
-        example="https://ejemplo.com/audio.wav"
+        examples=["https://ejemplo.com/audio.wav"]
     )
     ref_text: str = Field(
         ...,
         min_length=1,
         max_length=500,
         description="Texto correspondiente al audio de referencia",
-        example="Hola, esta es una prueba de mi voz..."
+        json_schema_extra=_lazy_example("VOICE_CLONE_REF_TEXT")
     )
-    language: str = Field(
+    language: LanguageName = Field(
         default="Spanish",
         description="Idioma del texto a generar",
-        example="Spanish"
+        examples=["Spanish"]
     )
-    output_format: str = Field(
+    output_format: OutputFormatName = Field(
         default="wav",
         description="Formato de salida del audio",
-        example="wav"
+        examples=["wav"]
+    )
+    inline: bool = Field(
+        default=False,
+        description="Si True, incluye el audio en audio_base64; si False, solo devuelve audio_url al endpoint binario"
     )
-    model_size: str = Field(
+    model_size: ModelSizeName = Field(
         default="1.7B",
         description="Tamaño del modelo a usar (0.6B más rápido, 1.7B mejor calidad)",
-        example="1.7B"
+        examples=["1.7B"]
     )
-    
-    @validator('language')
-    def validate_language(cls, v):
-        if v not in SUPPORTED_LANGUAGES:
-            raise ValueError(f"Idioma '{v}' no soportado. Opciones: {SUPPORTED_LANGUAGES}")
-        return v
-    
-    @validator('output_format')
-    def validate_format(cls, v):
-        if v not in OUTPUT_FORMATS:
-            raise ValueError(f"Formato '{v}' no soportado. Opciones: {OUTPUT_FORMATS}")
-        return v
-    
-    @validator('model_size')
-    def validate_model_size(cls, v):
-        if v not in MODEL_SIZES:
-            raise ValueError(f"Tamaño de modelo '{v}' no válido. Opciones: {MODEL_SIZES}")
-        return v
 
 
 class VoiceCloneFromFileRequest(GenerationParams):
@@ -318,18 +355,31 @@ class VoiceCloneFromFileRequest(GenerationParams):
 # RESPONSES
 # ============================================================
 
-class TTSResponse(BaseModel):
+class BaseSchema(BaseModel):
+    """
+    Base común de los modelos de respuesta.
+    Son de solo lectura (frozen): se construyen una vez y se serializan.
+    Los campos opcionales a None se omiten al serializar con to_json().
+    """
+    model_config = ConfigDict(ser_json_timedelta='iso8601', frozen=True)
+    
+    def to_json(self) -> bytes:
+        """Serializa el modelo a JSON (bytes) omitiendo campos None."""
+        return self.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8")
+
+
+class TTSResponse(BaseSchema):
     """
     Response estándar para generación de voz.
     """
     success: bool = Field(description="Indica si la generación fue exitosa")
     audio_base64: Optional[str] = Field(
         default=None, 
-        description="Audio codificado en base64"
+        description="Audio codificado en base64 (obsoleto: solo se rellena con inline=True)"
     )
     audio_url: Optional[str] = Field(
         default=None,
-        description="URL para descargar el audio generado"
+        description="URL para descargar el audio generado (GET /api/v1/audio/{audio_id}, binario)"
     )
     sample_rate: int = Field(
         default=24000,
@@ -349,7 +399,7 @@ class TTSResponse(BaseModel):
     )
 
 
-class ModelsInfoResponse(BaseModel):
+class ModelsInfoResponse(BaseSchema):
     """
     Response con información de modelos disponibles.
     """
@@ -364,118 +414,132 @@ class ModelsInfoResponse(BaseModel):
     )
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(BaseSchema):
     """
     Response de verificación de salud del sistema.
     """
     status: str = Field(
         description="Estado del servicio: healthy, degraded, unhealthy",
-        example="healthy"
+        examples=["healthy"]
     )
     timestamp: float = Field(
         description="Timestamp de la verificación en segundos desde epoch",
-        example=1704067200.0
+        examples=[1704067200.0]
     )
     cuda_available: bool = Field(
         description="Si CUDA/GPU está disponible",
-        example=True
+        examples=[True]
     )
     models_ready: bool = Field(
         description="Si los modelos esenciales están disponibles",
-        example=True
+        examples=[True]
     )
     cache_dir: str = Field(
         description="Directorio de caché de modelos",
-        example="/app/models"
+        examples=["/app/models"]
     )
 
 
-class RootResponse(BaseModel):
+class RootResponse(BaseSchema):
     """
     Response del endpoint raíz.
     """
     service: str = Field(
         description="Nombre del servicio",
-        example="Qwen3-TTS Service API"
+        examples=["Qwen3-TTS Service API"]
     )
     version: str = Field(
         description="Versión del servicio",
-        example="1.0.0"
+        examples=["1.0.0"]
     )
     status: str = Field(
         description="Estado del servicio",
-        example="running"
+        examples=["running"]
     )
     docs: str = Field(
         description="URL de la documentación Swagger",
-        example="/docs"
+        examples=["/docs"]
     )
     health: str = Field(
         description="URL del health check",
-        example="/api/v1/health"
+        examples=["/api/v1/health"]
     )
 
 
-class SpeakerInfo(BaseModel):
+class SpeakerInfo(BaseSchema):
     """
     Información de un speaker preestablecido.
     """
-    gender: str = Field(description="Género de la voz", example="Female")
-    language: str = Field(description="Idioma principal", example="Korean")
-    style: str = Field(description="Estilo de la voz", example="Natural")
+    gender: str = Field(description="Género de la voz", examples=["Female"])
+    language: str = Field(description="Idioma principal", examples=["Korean"])
+    style: str = Field(description="Estilo de la voz", examples=["Natural"])
 
 
-class SpeakersResponse(BaseModel):
+class SpeakersResponse(BaseSchema):
     """
     Response con lista de speakers disponibles.
     """
     speakers: List[str] = Field(
         description="Lista de nombres de speakers",
-        example=["Vivian", "Serena", "Sohee"]
+        examples=[["Vivian", "Serena", "Sohee"]]
     )
     details: Dict[str, SpeakerInfo] = Field(
         description="Detalles de cada speaker"
     )
 
 
-class LanguagesResponse(BaseModel):
+class LanguagesResponse(BaseSchema):
     """
     Response con lista de idiomas soportados.
     """
     languages: List[str] = Field(
         description="Lista de idiomas soportados",
-        example=["Auto", "Spanish", "English", "Chinese"]
+        examples=[["Auto", "Spanish", "English", "Chinese"]]
     )
     notes: str = Field(
         description="Notas sobre el uso de idiomas",
-        example="Use 'Auto' para detección automática del idioma"
+        examples=["Use 'Auto' para detección automática del idioma"]
     )
 
 
-class ModelStatusInfo(BaseModel):
+class ModelStatusInfo(BaseSchema):
     """
     Información del estado de un modelo.
     """
-    model_id: str = Field(description="ID del modelo", example="Qwen/Qwen3-TTS-12Hz-1.7B-Base")
-    installed: bool = Field(description="Si el modelo está instalado", example=True)
-    path: Optional[str] = Field(default=None, description="Ruta del modelo", example="/app/models/Qwen3-TTS-12Hz-1.7B-Base")
-    size_gb: Optional[float] = Field(default=None, description="Tamaño en GB", example=3.5)
+    model_id: str = Field(description="ID del modelo", examples=["Qwen/Qwen3-TTS-12Hz-1.7B-Base"])
+    installed: bool = Field(description="Si el modelo está instalado", examples=[True])
+    path: Optional[str] = Field(default=None, description="Ruta del modelo", examples=["/app/models/Qwen3-TTS-12Hz-1.7B-Base"])
+    size_gb: Optional[float] = Field(default=None, description="Tamaño en GB", examples=[3.5])
 
 
-class ModelsStatusResponse(BaseModel):
+class ModelsStatusResponse(BaseSchema):
     """
     Response con estado de todos los modelos.
     """
     models: Dict[str, Dict[str, ModelStatusInfo]] = Field(description="Estado de todos los modelos")
-    cache_dir: str = Field(description="Directorio de caché", example="/app/models")
+    cache_dir: str = Field(description="Directorio de caché", examples=["/app/models"])
+
+
+class ModelsStatusResponseV2(BaseSchema):
+    """
+    Response con estado de todos los modelos en formato columnar (struct-of-arrays).
+    La posición i de cada lista corresponde al mismo modelo; `index` mapea "tamaño/tipo" a esa posición.
+    """
+    model_ids: List[str] = Field(description="Repo ID de cada modelo", examples=[["Qwen/Qwen3-TTS-12Hz-1.7B-Base"]])
+    model_sizes: List[str] = Field(description="Tamaño de cada modelo", examples=[["1.7B"]])
+    model_types: List[str] = Field(description="Tipo de cada modelo", examples=[["voice_clone"]])
+    installed: List[bool] = Field(description="Si cada modelo está instalado", examples=[[True]])
+    paths: List[Optional[str]] = Field(description="Ruta de cada modelo (null si no está instalado)")
+    index: Dict[str, int] = Field(description="Posición de cada modelo por 'tamaño/tipo'", examples=[{"1.7B/voice_clone": 0}])
+    cache_dir: str = Field(description="Directorio de caché", examples=["/app/models"])
 
 
-class DownloadModelResponse(BaseModel):
+class DownloadModelResponse(BaseSchema):
     """
     Response de descarga de modelo.
     """
-    success: bool = Field(description="Si la descarga fue exitosa", example=True)
-    message: str = Field(description="Mensaje descriptivo", example="Modelo 1.7B/voice_clone descargado correctamente")
+    success: bool = Field(description="Si la descarga fue exitosa", examples=[True])
+    message: str = Field(description="Mensaje descriptivo", examples=["Modelo 1.7B/voice_clone descargado correctamente"])
 
 
 # ============================================================
@@ -499,9 +563,17 @@ class UpdateClonedVoiceRequest(BaseModel):
     description: Optional[str] = Field(None, max_length=200)
     # Permite actualizar los parámetros de generación por defecto
     generation_params: Optional[dict] = Field(None, description="Parámetros de generación por defecto")
+    
+    @field_validator('generation_params')
+    @classmethod
+    def validate_generation_params(cls, v):
+        if v is None:
+            return v
+        # Validar con los mismos límites que GenerationParams y conservar solo las claves enviadas
+        return intern_keys(_GENERATION_PARAMS_ADAPTER.validate_python(v).model_dump(exclude_unset=True))
 
 
-class ClonedVoiceInfo(BaseModel):
+class ClonedVoiceInfo(BaseSchema):
     """Información de una voz clonada."""
     id: str
     name: str
@@ -514,38 +586,38 @@ class ClonedVoiceInfo(BaseModel):
     generation_params: Optional[dict] = Field(None, description="Parámetros de generación por defecto")
 
 
-class ClonedVoiceListResponse(BaseModel):
+class ClonedVoiceListResponse(BaseSchema):
     """Respuesta con lista de voces clonadas."""
     voices: List[ClonedVoiceInfo]
     total: int
 
 
-class ClonedVoiceDetailResponse(BaseModel):
+class ClonedVoiceDetailResponse(BaseSchema):
     """Respuesta con detalle de una voz clonada."""
     voice: ClonedVoiceInfo
 
 
-class ClonedVoiceCreateResponse(BaseModel):
+class ClonedVoiceCreateResponse(BaseSchema):
     """Respuesta al crear una voz clonada."""
     success: bool = Field(description="Si la creación fue exitosa")
     voice: ClonedVoiceInfo
     message: str = Field(description="Mensaje descriptivo")
 
 
-class ClonedVoiceUpdateResponse(BaseModel):
+class ClonedVoiceUpdateResponse(BaseSchema):
     """Respuesta al actualizar una voz clonada."""
     success: bool
     voice: ClonedVoiceInfo
     message: str
 
 
-class ClonedVoiceDeleteResponse(BaseModel):
+class ClonedVoiceDeleteResponse(BaseSchema):
     """Respuesta al eliminar una voz clonada."""
     success: bool
     message: str
 
 
-class ClonedVoicesStatsResponse(BaseModel):
+class ClonedVoicesStatsResponse(BaseSchema):
     """Respuesta con estadísticas de voces clonadas."""
     total_voices: int = Field(description="Total de voces clonadas")
     total_generations: int = Field(description="Total de generaciones realizadas")
@@ -553,7 +625,7 @@ class ClonedVoicesStatsResponse(BaseModel):
     storage_size_mb: float = Field(description="Tamaño total en MB")
 
 
-class GenerateFromClonedVoiceRequest(GenerationParams):
+class GenerateFromClonedVoiceRequest(GenerationParams, HashedRequest):
     """Request para generar audio usando una voz clonada guardada.
     Hereda GenerationParams para permitir override de parámetros.
     Si no se especifican, usa los guardados con la voz clonada.
@@ -562,65 +634,56 @@ class GenerateFromClonedVoiceRequest(GenerationParams):
     voice_id: str = Field(..., description="ID de la voz clonada a usar")
     language: Optional[str] = Field(None, description="Idioma (opcional, usa el de la voz por defecto)")
     output_format: str = Field(default="wav", description="Formato de salida")
-    model_size: str = Field(default="1.7B", description="Tamaño del modelo (0.6B o 1.7B)")
+    model_size: ModelSizeName = Field(default="1.7B", description="Tamaño del modelo (0.6B o 1.7B)")
     use_voice_defaults: bool = Field(
         default=True,
         description="Si usar los parámetros guardados con la voz (True) o los de esta petición (False)"
     )
-    
-    @validator('model_size')
-    def validate_model_size(cls, v):
-        if v not in MODEL_SIZES:
-            raise ValueError(f"Tamaño de modelo '{v}' no válido. Opciones: {MODEL_SIZES}")
-        return v
+    inline: bool = Field(
+        default=False,
+        description="Si True, incluye el audio en audio_base64; si False, solo devuelve audio_url al endpoint binario"
+    )
 
 
 # ============================================================
 # SCHEMAS - JOBS ASÍNCRONOS
 # ============================================================
 
-class CreateJobRequest(BaseModel):
+class CreateJobRequest(HashedRequest):
     """Request para crear un job de generación de audio asíncrono."""
-    job_type: str = Field(
+    job_type: JobTypeName = Field(
         ...,
         description="Tipo de job: custom_voice, voice_design, voice_clone_url, voice_clone_file, cloned_voice_generate",
-        example="custom_voice"
+        examples=["custom_voice"]
     )
     request_data: Dict[str, Any] = Field(
         ...,
         description="Datos específicos del request según el tipo de job"
     )
-    
-    @validator('job_type')
-    def validate_job_type(cls, v):
-        valid_types = ["custom_voice", "voice_design", "voice_clone_url", "voice_clone_file", "cloned_voice_generate"]
-        if v not in valid_types:
-            raise ValueError(f"Tipo de job '{v}' no válido. Opciones: {valid_types}")
-        return v
 
 
-class JobProgressInfo(BaseModel):
+class JobProgressInfo(BaseSchema):
     """Información de progreso de un job."""
-    stage: str = Field(description="Etapa actual del procesamiento", example="generating")
-    percent: int = Field(description="Porcentaje de progreso (0-100)", example=75)
-    message: str = Field(description="Mensaje descriptivo", example="Generando audio...")
-    timestamp: float = Field(description="Timestamp de la última actualización", example=1704067200.0)
+    stage: str = Field(description="Etapa actual del procesamiento", examples=["generating"])
+    percent: int = Field(description="Porcentaje de progreso (0-100)", examples=[75])
+    message: str = Field(description="Mensaje descriptivo", examples=["Generando audio..."])
+    timestamp: float = Field(description="Timestamp de la última actualización", examples=[1704067200.0])
 
 
-class JobInfo(BaseModel):
+class JobInfo(BaseSchema):
     """Información de un job."""
-    id: str = Field(description="ID único del job", example="job_abc123")
-    type: str = Field(description="Tipo de job", example="custom_voice")
-    status: str = Field(description="Estado: pending, processing, completed, failed, cancelled, killed", example="processing")
-    created_at: float = Field(description="Timestamp de creación", example=1704067200.0)
-    updated_at: float = Field(description="Timestamp de última actualización", example=1704067200.0)
+    id: str = Field(description="ID único del job", examples=["job_abc123"])
+    type: str = Field(description="Tipo de job", examples=["custom_voice"])
+    status: str = Field(description="Estado: pending, processing, completed, failed, cancelled, killed", examples=["processing"])
+    created_at: float = Field(description="Timestamp de creación", examples=[1704067200.0])
+    updated_at: float = Field(description="Timestamp de última actualización", examples=[1704067200.0])
     progress: JobProgressInfo = Field(description="Progreso actual")
-    result: Optional[Dict] = Field(default=None, description="Resultado si está completado")
+    result: Optional[Dict] = Field(default=None, description="Resultado si está completado (en listados solo {\"__compressed__\": true, \"size\": n}; usar /jobs/{job_id}/result)")
     error: Optional[str] = Field(default=None, description="Mensaje de error si falló")
-    elapsed_seconds: float = Field(description="Tiempo transcurrido en segundos", example=5.3)
+    elapsed_seconds: float = Field(description="Tiempo transcurrido en segundos", examples=[5.3])
 
 
-class CreateJobResponse(BaseModel):
+class CreateJobResponse(BaseSchema):
     """Response al crear un job."""
     success: bool = Field(description="Si el job fue creado exitosamente")
     job_id: str = Field(description="ID del job creado")
@@ -629,32 +692,32 @@ class CreateJobResponse(BaseModel):
     status_url: str = Field(description="URL para consultar el estado del job")
 
 
-class JobListResponse(BaseModel):
+class JobListResponse(BaseSchema):
     """Response con lista de jobs."""
     jobs: List[JobInfo] = Field(description="Lista de jobs")
     total: int = Field(description="Total de jobs")
 
 
-class JobStatusResponse(BaseModel):
+class JobStatusResponse(BaseSchema):
     """Response con estado de un job."""
     job: JobInfo = Field(description="Información del job")
 
 
-class JobResultResponse(BaseModel):
+class JobResultResponse(BaseSchema):
     """Response con resultado de un job completado."""
     success: bool = Field(description="Si el job fue exitoso")
     job_id: str = Field(description="ID del job")
     result: Dict = Field(description="Resultado del job")
 
 
-class JobCancelResponse(BaseModel):
+class JobCancelResponse(BaseSchema):
     """Response de cancelación de job."""
     success: bool = Field(description="Si la cancelación fue exitosa")
     message: str = Field(description="Mensaje descriptivo")
     job_status: str = Field(description="Estado actual del job")
 
 
-class JobKillResponse(BaseModel):
+class JobKillResponse(BaseSchema):
     """Response de kill de job."""
     success: bool = Field(description="Si el kill fue exitoso")
     message: str = Field(description="Mensaje descriptivo")
@@ -663,14 +726,14 @@ class JobKillResponse(BaseModel):
     current_status: str = Field(description="Estado actual del job")
 
 
-class QueueStatusResponse(BaseModel):
+class QueueStatusResponse(BaseSchema):
     """Response con estado de la cola de jobs."""
     queue: Dict[str, int] = Field(description="Estado de la cola: pending, processing, max_concurrent")
     jobs: Dict[str, int] = Field(description="Estadísticas de jobs: total, completed, failed")
-    system_status: str = Field(description="Estado del sistema: available, busy", example="available")
+    system_status: str = Field(description="Estado del sistema: available, busy", examples=["available"])
 
 
-class JobDeleteResponse(BaseModel):
+class JobDeleteResponse(BaseSchema):
     """Response de eliminación de job."""
     success: bool = Field(description="Si la eliminación fue exitosa")
     message: str = Field(description="Mensaje descriptivo")
@@ -680,15 +743,26 @@ class JobDeleteResponse(BaseModel):
 # SCHEMAS - DESCARGA DE ARCHIVOS
 # ============================================================
 
-class DownloadFileResponse(BaseModel):
+class DownloadFileResponse(BaseSchema):
     """
     Response para descarga de archivos de audio.
     Nota: Este endpoint retorna el archivo directamente, no un JSON.
     """
-    filename: str = Field(description="Nombre del archivo", example="audio_generated.wav")
-    content_type: str = Field(description="Tipo MIME del archivo", example="audio/wav")
+    filename: str = Field(description="Nombre del archivo", examples=["audio_generated.wav"])
+    content_type: str = Field(description="Tipo MIME del archivo", examples=["audio/wav"])
     
-    class Config:
-        json_schema_extra = {
-            "description": "Este endpoint retorna el archivo de audio directamente como binary/octet-stream"
-        }
+    model_config = ConfigDict(json_schema_extra={
+        "description": "Este endpoint retorna el archivo de audio directamente como binary/octet-stream"
+    })
+
+
+# ============================================================
+# PRECOMPILACIÓN DE ESQUEMAS
+# ============================================================
+
+# Completa en el import cualquier esquema pendiente (referencias adelantadas) para que
+# pydantic-core no lo construya en la primera validación de una petición.
+for _model in list(globals().values()):
+    if isinstance(_model, type) and issubclass(_model, BaseModel) and _model is not BaseModel:
+        _model.model_rebuild()
+del _model
@@ -0,0 +1,107 @@
+"""
+BatchCoalescer - Agrupa peticiones concurrentes del mismo tipo en una sola pasada del modelo.
+
+Los procesadores de jobs se ejecutan en hilos del executor del JobManager; cada uno
+llama a submit() y queda bloqueado hasta que el lote al que se ha unido termina.
+El primer hilo que llega para una clave actúa de líder: espera una ventana corta
+(o a que el lote se llene), ejecuta el lote completo y reparte los resultados.
+
+Los lotes de un mismo coalescedor se ejecutan de uno en uno (batching dinámico):
+mientras el modelo está ocupado, las peticiones nuevas se acumulan en el lote abierto,
+que se lanza en cuanto termina el anterior, con el tamaño que haya alcanzado.
+
+Solo se forman lotes si varios jobs llegan a la vez: requiere JOB_MAX_CONCURRENT > 1
+(por defecto el JobManager usa TTS_MAX_BATCH_SIZE workers).
+"""
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatchCoalescer:
+    """
+    Coalescedor de peticiones por clave (tipo de modelo, tamaño, parámetros de generación).
+    Solo se agrupan peticiones con la misma clave, ya que comparten modelo y kwargs de generación.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[Hashable, List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        window_seconds: float = 0.02
+    ):
+        self.name = name
+        self._run_batch = run_batch
+        self._max_batch_size = max(1, max_batch_size)
+        self._window = max(0.0, window_seconds)
+        self._cond = threading.Condition()
+        self._pending: Dict[Hashable, List[Tuple[Any, Future]]] = {}
+        self._busy = False            # Hay un lote ejecutándose en el modelo
+
+    def submit(self, key: Hashable, item: Any) -> Any:
+        """
+        Añade una petición al lote abierto para la clave y espera su resultado.
+
+        Args:
+            key: Clave de agrupación (peticiones con la misma clave comparten pasada)
+            item: Datos de la petición que recibirá run_batch
+
+        Returns:
+            El resultado correspondiente a esta petición
+        """
+        future: Future = Future()
+        with self._cond:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = []
+            batch.append((item, future))
+            if len(batch) >= self._max_batch_size:
+                # Lote lleno: cerrarlo para que las siguientes peticiones abran otro
+                del self._pending[key]
+                self._cond.notify_all()
+
+        if leader:
+            deadline = time.monotonic() + self._window
+            with self._cond:
+                while True:
+                    is_open = self._pending.get(key) is batch
+                    remaining = deadline - time.monotonic()
+                    if not self._busy and (not is_open or remaining <= 0):
+                        if is_open:
+                            del self._pending[key]
+                        self._busy = True
+                        break
+                    # Con el modelo ocupado se espera a que termine el lote en curso
+                    self._cond.wait(None if self._busy else remaining)
+            try:
+                self._execute(key, batch)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+        return future.result()
+
+    def _execute(self, key: Hashable, batch: List[Tuple[Any, Future]]):
+        """Ejecuta un lote cerrado y reparte resultados o la excepción a cada petición."""
+        items = [item for item, _ in batch]
+        if len(items) > 1:
+            logger.info("%s: ejecutando lote de %d peticiones", self.name, len(items))
+        try:
+            results = self._run_batch(key, items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"{self.name}: el lote devolvió {len(results)} resultados para {len(items)} peticiones"
+                )
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
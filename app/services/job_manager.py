@@ -4,18 +4,64 @@ Permite procesar solicitudes largas sin bloquear al cliente.
 """
 
 import os
+import sys
+import functools
 import time
-import uuid
+import secrets
 import asyncio
 import logging
-from typing import Dict, Optional, Callable, Any, AsyncGenerator, Set
+from typing import Dict, List, Optional, Callable, Any, AsyncGenerator, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
-from datetime import datetime, timedelta
 import threading
+from concurrent.futures import ThreadPoolExecutor
+import zlib
+from collections import defaultdict, deque
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Nivel de compresión zlib de los resultados de jobs (rápido, buena ratio para JSON)
+RESULT_COMPRESSION_LEVEL = 3
+
+# Intervalo mínimo (segundos) entre notificaciones de progreso de un mismo job
+PROGRESS_NOTIFY_INTERVAL = 0.05
+
+# Etapas que siempre se notifican aunque llegue antes del intervalo
+_ALWAYS_NOTIFY_STAGES = frozenset({"completed", "error", "cancelled", "killed"})
+
+# Intervalo (segundos) del heartbeat de los streams SSE: separación máxima entre eventos
+SSE_HEARTBEAT_INTERVAL = 15.0
+# El temporizador compartido despierta a los streams cada tercio de intervalo; cada stream emite
+# heartbeat si lleva sin eventos al menos intervalo - tick, así el hueco nunca supera el intervalo
+_SSE_HEARTBEAT_TICK = SSE_HEARTBEAT_INTERVAL / 3
+
+# Antigüedad máxima (segundos) de un job terminado antes de eliminarlo
+JOB_MAX_AGE = 3600
+
+# Prefijos de los eventos SSE, codificados una sola vez (el servidor envía los bytes tal cual)
+_EVT_PROGRESS = b"event: progress\ndata: "
+_EVT_HEARTBEAT = b"event: heartbeat\ndata: "
+_EVT_COMPLETED = b"event: completed\ndata: "
+_EVT_ERROR = b"event: error\ndata: "
+_EVT_CANCELLED = b"event: cancelled\ndata: "
+_EVT_KILLED = b"event: killed\ndata: "
+_SEP = b"\n\n"
+
+# Plantillas de frame completas: cada evento se genera con una única operación de formato
+_SSE_PROGRESS = _EVT_PROGRESS + b'{"stage":%b,"percent":%d,"message":%b,"timestamp":%r}' + _SEP
+_SSE_HEARTBEAT = _EVT_HEARTBEAT + b'{"timestamp":%r}' + _SEP
+_SSE_COMPLETED = _EVT_COMPLETED + b'{"status":"completed","result":%b}' + _SEP
+_SSE_FAILED = _EVT_ERROR + b'{"status":"failed","error":%b}' + _SEP
+_SSE_KILLED = _EVT_KILLED + b'{"status":"killed","error":%b}' + _SEP
+_SSE_NOT_FOUND = _EVT_ERROR + b'{"error":"Job no encontrado"}' + _SEP
+_SSE_CANCELLED = _EVT_CANCELLED + b'{"status":"cancelled"}' + _SEP
+
+# Etapas y mensajes de progreso se repiten entre actualizaciones y jobs: su codificación
+# JSON se memoiza para no volver a escaparlos en cada frame
+_json_str = functools.lru_cache(maxsize=512)(orjson.dumps)
+
 
 class JobCancellationError(Exception):
     """Excepción lanzada cuando un job es cancelado."""
@@ -32,16 +78,28 @@ class JobStatus(str, Enum):
     KILLED = "killed"             # Matado forzosamente
 
 
-@dataclass
+# Conjuntos de estados precalculados (comparación por hash en lugar de listas temporales)
+_ACTIVE_STATES = frozenset({JobStatus.PENDING, JobStatus.PROCESSING})
+_TERMINAL_STATES = frozenset({JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.KILLED})
+_STOPPED_STATES = frozenset({JobStatus.CANCELLED, JobStatus.KILLED})
+
+
+@dataclass(frozen=True, slots=True)
 class JobProgress:
-    """Progreso de un job."""
+    """Progreso de un job (inmutable: cada actualización crea uno nuevo)."""
     stage: str                    # Etapa actual (ej: "loading_model", "generating_audio", "encoding")
     percent: int                  # Porcentaje (0-100)
     message: str                  # Mensaje descriptivo
     timestamp: float = field(default_factory=time.time)
 
 
-@dataclass
+def _fanout(subscribers: tuple):
+    """Despierta a todos los suscriptores de un job (se ejecuta en el event loop)."""
+    for event in subscribers:
+        event.set()
+
+
+@dataclass(slots=True)
 class Job:
     """Representa un trabajo de generación de audio."""
     id: str
@@ -58,20 +116,95 @@ class Job:
         stage="created", percent=0, message="Job creado"
     ))
     
-    # Resultado
-    result: Optional[Dict] = None
+    # Resultado (comprimido; se accede mediante la propiedad result)
+    _result_blob: Optional[bytes] = field(default=None, repr=False)
+    # Audio binario de jobs con binary_output: se guarda tal cual, fuera del JSON del resultado
+    _audio_bytes: Optional[bytes] = field(default=None, repr=False)
     error: Optional[str] = None
     
     # Control de cancelación
-    _cancelled: bool = field(default=False)
-    _processing_task: Optional[asyncio.Task] = field(default=None)
+    # threading.Event: el procesador (en otro thread) puede consultarlo o esperar sobre él
+    _cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _processing_task: Optional[asyncio.Future] = field(default=None)   # Future del executor
+    
+    # Suscriptores de progreso: un asyncio.Event por stream SSE ("hay progreso nuevo"),
+    # agrupados por el event loop al que pertenecen. El dict no se modifica nunca:
+    # se reemplaza entero al suscribir/desuscribir (copy-on-write)
+    _subscribers: Dict[asyncio.AbstractEventLoop, tuple] = field(default_factory=dict, repr=False)
+    
+    # Caché de to_dict(include_result=False) y la clave de estado con la que se generó
+    _dict_cache: Optional[dict] = field(default=None, repr=False)
+    _dict_cache_key: Optional[tuple] = field(default=None, repr=False)
+    
+    # Momento de la última notificación a los suscriptores (para limitar la frecuencia)
+    _last_notify_ts: float = field(default=0.0, repr=False)
+    # Hay un envío diferido programado para el último progreso descartado por la limitación
+    _flush_pending: bool = field(default=False, repr=False)
+    
+    # Reloj monotónico de creación: elapsed_seconds no depende de ajustes del reloj de pared
+    _created_mono_ns: int = field(default_factory=time.monotonic_ns, repr=False)
+
+    
+    @property
+    def result(self) -> Optional[Dict]:
+        """Resultado del job (se descomprime en cada acceso)."""
+        if self._result_blob is None:
+            return None
+        return orjson.loads(zlib.decompress(self._result_blob))
+    
+    @result.setter
+    def result(self, value: Optional[Dict]):
+        self._audio_bytes = None
+        if value is not None and "audio_bytes" in value:
+            # Audio binario (binary_output): no cabe en JSON; en el resultado queda su tamaño
+            value = dict(value)
+            self._audio_bytes = value.pop("audio_bytes")
+            value["audio_size"] = len(self._audio_bytes)
+        # El resultado puede incluir el audio en base64: se guarda comprimido para reducir memoria
+        self._result_blob = None if value is None else zlib.compress(orjson.dumps(value), RESULT_COMPRESSION_LEVEL)
     
-    # Callbacks de progreso
-    _progress_callbacks: list = field(default_factory=list)
-    _lock: threading.Lock = field(default_factory=threading.Lock)
+    @property
+    def audio_bytes(self) -> Optional[bytes]:
+        """Audio binario del resultado (solo jobs creados con binary_output)."""
+        return self._audio_bytes
     
-    def to_dict(self) -> dict:
-        """Convierte el job a diccionario."""
+    def result_json(self) -> Optional[bytes]:
+        """Resultado como JSON (bytes) sin pasar por diccionario: basta con descomprimir."""
+        if self._result_blob is None:
+            return None
+        return zlib.decompress(self._result_blob)
+    
+    def result_summary(self) -> Optional[Dict]:
+        """Marcador ligero del resultado para listados (no descomprime)."""
+        if self._result_blob is None:
+            return None
+        return {"__compressed__": True, "size": len(self._result_blob)}
+    
+    def to_dict(self, include_result: bool = True) -> dict:
+        """
+        Convierte el job a diccionario.
+        
+        Args:
+            include_result: Si False, el resultado se sustituye por result_summary().
+                En ese caso se devuelve el diccionario cacheado del job: no debe modificarse.
+        """
+        if not include_result:
+            # Los listados se consultan mucho más a menudo de lo que cambia un job:
+            # se reutiliza el diccionario mientras no cambien estado, progreso o error
+            key = (self.status, self.progress, self.updated_at, self.error, self._result_blob is not None)
+            cached = self._dict_cache
+            if cached is None or self._dict_cache_key != key:
+                cached = self._dict_cache = self._build_dict(self.result_summary())
+                self._dict_cache_key = key
+            # Solo elapsed_seconds cambia entre llamadas: se actualiza en el propio diccionario
+            cached["elapsed_seconds"] = (time.monotonic_ns() - self._created_mono_ns) / 1e9
+            return cached
+        return self._build_dict(self.result)
+    
+    def _build_dict(self, result: Optional[Dict]) -> dict:
+        """Construye el diccionario del job con el resultado indicado."""
+        # Referencias locales: una sola búsqueda de atributo por campo
+        progress = self.progress
         return {
             "id": self.id,
             "type": self.job_type,
@@ -79,72 +212,138 @@ class Job:
             "created_at": self.created_at,
             "updated_at": self.updated_at,
             "progress": {
-                "stage": self.progress.stage,
-                "percent": self.progress.percent,
-                "message": self.progress.message,
-                "timestamp": self.progress.timestamp
+                "stage": progress.stage,
+                "percent": progress.percent,
+                "message": progress.message,
+                "timestamp": progress.timestamp
             },
-            "result": self.result,
+            "result": result,
             "error": self.error,
-            "elapsed_seconds": time.time() - self.created_at
+            "elapsed_seconds": (time.monotonic_ns() - self._created_mono_ns) / 1e9
         }
     
-    def update_progress(self, stage: str, percent: int, message: str):
-        """Actualiza el progreso del job."""
-        with self._lock:
-            self.progress = JobProgress(
-                stage=stage,
-                percent=percent,
-                message=message,
-                timestamp=time.time()
-            )
-            self.updated_at = time.time()
-        
-        # Notificar callbacks
-        for callback in self._progress_callbacks:
+    def update_progress(self, stage: str, percent: int, message: str, force: bool = False):
+        """
+        Actualiza el progreso del job.
+        Sin lock: JobProgress es inmutable y la asignación del atributo es atómica bajo el GIL,
+        así que los lectores siempre ven un snapshot completo (el anterior o el nuevo).
+        
+        El progreso se guarda siempre, pero los suscriptores solo se notifican como mucho
+        cada PROGRESS_NOTIFY_INTERVAL, salvo inicio/fin (0/100), etapas finales o force=True.
+        Una actualización descartada se envía al final del intervalo, para que no quede
+        pendiente hasta la siguiente actualización o el heartbeat.
+        """
+        now = time.time()
+        
+        # Tick repetido (misma etapa, porcentaje y mensaje): se conserva el snapshot actual
+        # en lugar de asignar otro JobProgress idéntico. No se reciclan instancias: los lectores
+        # sin lock dependen de que un JobProgress publicado no cambie nunca
+        current = self.progress
+        if (not force and current.percent == percent
+                and current.stage == stage and current.message == message):
+            self.updated_at = now
+            return
+        
+        # Las etapas y mensajes se repiten en cada job: internarlos comparte una sola copia
+        progress = JobProgress(
+            stage=sys.intern(stage),
+            percent=percent,
+            message=sys.intern(message),
+            timestamp=now
+        )
+        self.progress = progress
+        self.updated_at = now
+        
+        if not (force or percent in (0, 100) or stage in _ALWAYS_NOTIFY_STAGES
+                or now - self._last_notify_ts >= PROGRESS_NOTIFY_INTERVAL):
+            if self._subscribers and not self._flush_pending:
+                self._flush_pending = True
+                self._schedule_flush(PROGRESS_NOTIFY_INTERVAL - (now - self._last_notify_ts))
+            return
+        self._last_notify_ts = now
+        
+        # Los suscriptores leen job.progress al despertar
+        if self._subscribers:
+            self._notify_subscribers()
+    
+    def _schedule_flush(self, delay: float):
+        """Programa en cada event loop suscrito el envío diferido del progreso (desde cualquier hilo)."""
+        for loop in self._subscribers:
             try:
-                callback(self.progress)
-            except Exception as e:
-                logger.error(f"Error en progress callback: {e}")
+                loop.call_soon_threadsafe(loop.call_later, max(0.0, delay), self._flush_progress, loop)
+            except RuntimeError:
+                pass  # Event loop cerrado
     
-    def add_progress_callback(self, callback: Callable[[JobProgress], None]):
-        """Añade un callback de progreso."""
-        with self._lock:
-            self._progress_callbacks.append(callback)
+    def _flush_progress(self, loop: asyncio.AbstractEventLoop):
+        """Envío diferido del último progreso (se ejecuta en el event loop indicado)."""
+        self._flush_pending = False
+        self._last_notify_ts = time.time()
+        _fanout(self._subscribers.get(loop, ()))
     
-    def remove_progress_callback(self, callback: Callable[[JobProgress], None]):
-        """Elimina un callback de progreso."""
-        with self._lock:
-            if callback in self._progress_callbacks:
-                self._progress_callbacks.remove(callback)
+    def force_update_progress(self, stage: str, percent: int, message: str):
+        """Actualiza el progreso notificando siempre (transiciones a estados finales)."""
+        self.update_progress(stage, percent, message, force=True)
+    
+    def subscribe(self) -> asyncio.Event:
+        """
+        Suscribe un consumidor al progreso del job (debe llamarse desde el event loop).
+        
+        Returns:
+            Evento que se activa cuando hay progreso nuevo; el consumidor lee job.progress
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        subscribers = dict(self._subscribers)
+        subscribers[loop] = subscribers.get(loop, ()) + (event,)
+        self._subscribers = subscribers
+        return event
+    
+    def unsubscribe(self, event: asyncio.Event):
+        """Elimina una suscripción creada con subscribe() (desde el mismo event loop)."""
+        loop = asyncio.get_running_loop()
+        subscribers = dict(self._subscribers)
+        remaining = tuple(e for e in subscribers.get(loop, ()) if e is not event)
+        if remaining:
+            subscribers[loop] = remaining
+        else:
+            subscribers.pop(loop, None)
+        self._subscribers = subscribers
+    
+    def _notify_subscribers(self, current_loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Despierta a los suscriptores: un único call_soon_threadsafe por event loop,
+        independientemente del número de suscriptores de cada uno.
+        
+        Args:
+            current_loop: Loop desde el que se llama, si se conoce; sus suscriptores se
+                despiertan directamente sin pasar por call_soon_threadsafe
+        """
+        for loop, events in self._subscribers.items():
+            if loop is current_loop:
+                _fanout(events)
+                continue
+            try:
+                loop.call_soon_threadsafe(_fanout, events)
+            except RuntimeError:
+                pass  # Event loop cerrado
     
     def is_cancelled(self) -> bool:
         """Verifica si el job ha sido marcado para cancelación."""
-        with self._lock:
-            return self._cancelled or self.status in [JobStatus.CANCELLED, JobStatus.KILLED]
+        return self._cancel_event.is_set() or self.status in _STOPPED_STATES
     
     def request_cancellation(self):
         """Marca el job para ser cancelado."""
-        with self._lock:
-            self._cancelled = True
+        self._cancel_event.set()
 
 
 class JobManager:
     """
     Gestiona jobs de generación de audio con cola FIFO.
-    Implementa el patrón singleton para acceso global.
+    Se usa la instancia global job_manager definida al final del módulo.
     """
-    _instance: Optional['JobManager'] = None
-    _lock = threading.Lock()
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
     
-    def __init__(self, max_jobs: int = 100, cleanup_interval: int = 300, max_concurrent: int = 1):
+    def __init__(self, max_jobs: int = 100, cleanup_interval: int = 300, max_concurrent: int = 1,
+                 max_queue: Optional[int] = None):
         """
         Inicializa el JobManager.
         
@@ -152,50 +351,113 @@ class JobManager:
             max_jobs: Máximo número de jobs a mantener en memoria
             cleanup_interval: Intervalo en segundos para limpieza de jobs antiguos
             max_concurrent: Máximo de jobs procesando simultáneamente (1 = secuencial FIFO)
+            max_queue: Máximo de jobs esperando en cola (por defecto max(16, max_concurrent * 8))
         """
-        # Evitar reinicialización del singleton
-        if hasattr(self, '_initialized'):
-            return
-        self._initialized = True
-        
         self._jobs: Dict[str, Job] = {}
+        # Índice secundario por estado (dict como conjunto ordenado): los filtros por estado
+        # recorren solo su bucket. Se mantiene con _set_status()
+        self._by_status: Dict[JobStatus, Dict[str, Job]] = defaultdict(dict)
         self._max_jobs = max_jobs
         self._cleanup_interval = cleanup_interval
         self._max_concurrent = max_concurrent
+        self._max_queue = max_queue if max_queue is not None else max(16, max_concurrent * 8)
         self._lock = threading.Lock()
         
-        # Cola FIFO para jobs pendientes
-        self._queue: Optional[asyncio.Queue] = None
+        # Cola (updated_at, job_id) de jobs terminados. Los jobs se registran al terminar, así
+        # que llegan ya ordenados por tiempo: la limpieza solo toca los expirados del principio
+        self._terminal_queue: deque = deque()
+        
+        # Cola FIFO de jobs pendientes: deque propia (en lugar de asyncio.Queue) para poder
+        # retirar al instante los jobs cancelados antes de empezar
+        self._queue: deque = deque()
+        self._queue_event: Optional[asyncio.Event] = None   # "Hay jobs en cola"
+        self._space_event: Optional[asyncio.Event] = None   # "Hay hueco en la cola"
+        # Solo lo modifican los workers, todos en el event loop: no necesita lock
         self._processing_count = 0
-        self._queue_lock = None
         self._workers: List[asyncio.Task] = []
         self._workers_started = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Pool propio para los procesadores: como mucho max_concurrent inferencias a la vez,
+        # sin competir con el executor por defecto que usa el resto de la aplicación
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="jobmgr")
         
         # Iniciar tarea de limpieza en background
         self._cleanup_task = None
         
+        # Temporizador único de heartbeat para todos los streams SSE
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        
         logger.info(f"JobManager inicializado (max_jobs={max_jobs}, max_concurrent={max_concurrent})")
     
-    def _ensure_queue(self):
-        """Asegura que la cola y el lock estén inicializados."""
-        if self._queue is None:
-            self._queue = asyncio.Queue()
-            self._queue_lock = asyncio.Lock()
-    
     async def _start_workers(self):
         """Inicia los workers que procesan la cola."""
         if self._workers_started:
             return
         
-        self._ensure_queue()
+        self._queue_event = asyncio.Event()
+        self._space_event = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
         
         for i in range(self._max_concurrent):
             worker = asyncio.create_task(self._worker_loop(f"worker-{i}"))
             self._workers.append(worker)
             logger.info(f"Worker {i} iniciado")
         
+        # Limpieza periódica de jobs antiguos
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        
         self._workers_started = True
     
+    async def shutdown(self, wait: bool = True):
+        """
+        Detiene workers y limpieza, y libera los threads del executor.
+        
+        Args:
+            wait: Si True, espera a que terminen los procesadores en ejecución
+        """
+        tasks = self._workers + [t for t in (self._cleanup_task, self._heartbeat_task) if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._cleanup_task = None
+        self._heartbeat_task = None
+        self._workers_started = False
+        
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info("JobManager detenido")
+    
+    async def _heartbeat_loop(self):
+        """
+        Despierta periódicamente los streams de los jobs activos.
+        Un solo temporizador para todas las conexiones en lugar de un timeout por stream;
+        el stream que despierta sin progreso nuevo emite un heartbeat.
+        """
+        while True:
+            try:
+                await asyncio.sleep(_SSE_HEARTBEAT_TICK)
+                for status in _ACTIVE_STATES:
+                    for job in tuple(self._by_status[status].values()):
+                        if job._subscribers:
+                            job._notify_subscribers(self._loop)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error en heartbeat de streams: {e}")
+    
+    async def _cleanup_loop(self):
+        """Elimina periódicamente los jobs terminados que han expirado."""
+        while True:
+            try:
+                await asyncio.sleep(self._cleanup_interval)
+                with self._lock:
+                    self._cleanup_old_jobs()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error en limpieza de jobs: {e}")
+    
     async def _worker_loop(self, worker_id: str):
         """
         Loop de trabajo que procesa jobs de la cola FIFO.
@@ -207,13 +469,17 @@ class JobManager:
         
         while True:
             try:
-                # Obtener job de la cola (bloquea hasta que haya uno)
-                job, processor = await self._queue.get()
+                # Obtener job de la cola (espera hasta que haya uno)
+                if not self._queue:
+                    self._queue_event.clear()
+                    await self._queue_event.wait()
+                    continue
+                job, processor = self._queue.popleft()
+                self._space_event.set()
                 
-                async with self._queue_lock:
-                    self._processing_count += 1
+                self._processing_count += 1
                 
-                logger.info(f"{worker_id}: Procesando job {job.id[:8]}... (cola: {self._queue.qsize()} pendientes)")
+                logger.info(f"{worker_id}: Procesando job {job.id[:8]}... (cola: {len(self._queue)} pendientes)")
                 
                 try:
                     # Procesar el job
@@ -221,11 +487,7 @@ class JobManager:
                 except Exception as e:
                     logger.error(f"{worker_id}: Error procesando job {job.id}: {e}")
                 finally:
-                    async with self._queue_lock:
-                        self._processing_count -= 1
-                    
-                    # Marcar como completado en la cola
-                    self._queue.task_done()
+                    self._processing_count -= 1
                     
             except asyncio.CancelledError:
                 logger.info(f"{worker_id}: Cancelado")
@@ -235,74 +497,65 @@ class JobManager:
     
     async def _process_job_internal(self, job: Job, processor: Callable):
         """Procesa un job internamente con soporte para cancelación."""
-        # Crear la tarea de procesamiento para poder cancelarla
-        loop = asyncio.get_event_loop()
+        # Función de progreso que verifica cancelación
+        def progress_callback(stage: str, percent: int, message: str):
+            if job.is_cancelled():
+                raise JobCancellationError("Job cancelado durante el procesamiento")
+            job.update_progress(stage, percent, message)
         
-        async def process_with_cancellation():
-            """Wrapper que verifica cancelación durante el procesamiento."""
+        try:
             # Verificar si fue cancelado antes de empezar
             if job.is_cancelled():
                 raise JobCancellationError("Job cancelado antes de iniciar")
             
-            job.status = JobStatus.PROCESSING
+            self._set_status(job, JobStatus.PROCESSING)
             job.update_progress("starting", 0, "Iniciando procesamiento...")
             
-            # Función de progreso que verifica cancelación
-            def progress_callback(stage: str, percent: int, message: str):
-                if job.is_cancelled():
-                    raise JobCancellationError("Job cancelado durante el procesamiento")
-                job.update_progress(stage, percent, message)
-            
-            # Ejecutar el procesador en thread pool
-            result = await loop.run_in_executor(
-                None,
-                lambda: processor(job, progress_callback)
-            )
-            
-            return result
-        
-        # Guardar referencia a la tarea para poder cancelarla
-        job._processing_task = asyncio.create_task(process_with_cancellation())
-        
-        try:
-            # Esperar a que termine la tarea
+            # Ejecutar el procesador en thread pool. Se espera directamente en el worker, sin
+            # tarea intermedia: kill_job cancela este future y el CancelledError llega aquí
+            job._processing_task = self._loop.run_in_executor(self._executor, processor, job, progress_callback)
             result = await job._processing_task
             
             # Verificar si fue cancelado durante la ejecución
             if job.is_cancelled():
-                job.status = JobStatus.KILLED
+                self._set_status(job, JobStatus.KILLED)
                 job.error = "Job cancelado durante el procesamiento"
-                job.update_progress("killed", 0, "Job cancelado")
+                job.force_update_progress("killed", 0, "Job cancelado")
                 logger.info(f"Job cancelado: {job.id}")
                 return
             
             # Marcar como completado
             job.result = result
-            job.status = JobStatus.COMPLETED
-            job.update_progress("completed", 100, "Procesamiento completado")
+            self._set_status(job, JobStatus.COMPLETED)
+            job.force_update_progress("completed", 100, "Procesamiento completado")
             logger.info(f"Job completado: {job.id}")
             
         except asyncio.CancelledError:
-            # Job fue cancelado externamente (vía kill_job)
-            job.status = JobStatus.KILLED
+            # Job fue cancelado externamente (vía kill_job) o se está deteniendo el worker
+            self._set_status(job, JobStatus.KILLED)
             job.error = "Job matado por el usuario"
-            job.update_progress("killed", 0, "Job matado")
+            job.force_update_progress("killed", 0, "Job matado")
             logger.info(f"Job matado: {job.id}")
+            if not job._cancel_event.is_set():
+                # No viene de kill_job (que marca la cancelación antes): es el worker el cancelado
+                raise
             
         except JobCancellationError as e:
             # Job fue cancelado durante el procesamiento
-            job.status = JobStatus.CANCELLED
+            self._set_status(job, JobStatus.CANCELLED)
             job.error = str(e)
-            job.update_progress("cancelled", 0, "Job cancelado")
+            job.force_update_progress("cancelled", 0, "Job cancelado")
             logger.info(f"Job cancelado: {job.id} - {e}")
             
         except Exception as e:
-            logger.error(f"Error procesando job {job.id}: {e}")
-            job.status = JobStatus.FAILED
+            # Único punto de log de los fallos de los procesadores (con traceback)
+            logger.error(f"Error procesando job {job.id} ({job.job_type}): {e}", exc_info=True)
+            self._set_status(job, JobStatus.FAILED)
             job.error = str(e)
-            job.update_progress("error", 0, f"Error: {str(e)}")
+            job.force_update_progress("error", 0, f"Error: {str(e)}")
         finally:
             job._processing_task = None
+            self._mark_terminal(job)
     
     def create_job(self, job_type: str, request_data: Dict[str, Any]) -> Job:
         """
@@ -315,7 +568,8 @@ class JobManager:
         Returns:
             El job creado
         """
-        job_id = str(uuid.uuid4())
+        # 128 bits aleatorios como uuid4, sin construir el objeto UUID
+        job_id = secrets.token_hex(16)
         now = time.time()
         
         job = Job(
@@ -333,20 +587,83 @@ class JobManager:
                 self._cleanup_old_jobs()
             
             self._jobs[job_id] = job
+            self._by_status[JobStatus.PENDING][job_id] = job
         
         logger.info(f"Job creado: {job_id} (tipo: {job_type})")
         return job
     
+    def try_enqueue(self, job: Job, processor: Callable) -> bool:
+        """
+        Encola un job sin esperar.
+        
+        Returns:
+            False si la cola está llena
+        
+        Raises:
+            RuntimeError: Si los workers no se han iniciado
+        """
+        if not self._workers_started:
+            raise RuntimeError("Los workers del JobManager no están iniciados")
+        # Cola acotada: bajo ráfagas se rechazan jobs en lugar de crecer sin límite
+        if len(self._queue) >= self._max_queue:
+            return False
+        self._queue.append((job, processor))
+        self._queue_event.set()
+        return True
+    
+    async def enqueue(self, job: Job, processor: Callable):
+        """Encola un job esperando a que haya hueco en la cola."""
+        if not self._workers_started:
+            raise RuntimeError("Los workers del JobManager no están iniciados")
+        while not self.try_enqueue(job, processor):
+            self._space_event.clear()
+            await self._space_event.wait()
+    
+    def queue_size(self) -> int:
+        """Número de jobs esperando en cola."""
+        return len(self._queue)
+    
+    def _dequeue_pending(self, job: Job) -> bool:
+        """Retira de la cola un job pendiente (O(tamaño de la cola))."""
+        # Búsqueda por identidad y borrado por índice: deque.remove() compararía con ==
+        # y el __eq__ del dataclass Job compara todos los campos de cada job que precede
+        for index, item in enumerate(self._queue):
+            if item[0] is job:
+                del self._queue[index]
+                if self._space_event is not None:
+                    self._space_event.set()
+                return True
+        return False
+    
     def get_job(self, job_id: str) -> Optional[Job]:
-        """Obtiene un job por su ID."""
+        """Obtiene un job por su ID (sin lock: dict.get es atómico bajo el GIL)."""
         return self._jobs.get(job_id)
     
-    def list_jobs(self, status: Optional[JobStatus] = None) -> list:
-        """Lista todos los jobs, opcionalmente filtrados por estado."""
-        jobs = list(self._jobs.values())
-        if status:
-            jobs = [j for j in jobs if j.status == status]
-        return [j.to_dict() for j in jobs]
+    def list_job_ids(self, status: Optional[JobStatus] = None) -> List[str]:
+        """Lista los IDs de los jobs (sin construir diccionarios), opcionalmente filtrados por estado."""
+        return list(self._jobs if status is None else self._by_status[status])
+    
+    def list_jobs(self, status: Optional[JobStatus] = None, limit: Optional[int] = 50, offset: int = 0) -> list:
+        """
+        Lista los jobs, opcionalmente filtrados por estado y paginados.
+        Solo se serializan los jobs de la ventana [offset, offset + limit).
+        
+        Args:
+            status: Estado por el que filtrar
+            limit: Máximo de jobs a devolver (None = todos)
+            offset: Número de jobs a saltar
+        """
+        # Snapshot sin lock (atómico bajo el GIL) del registro o del bucket del estado
+        jobs = tuple(self._jobs.values() if status is None else self._by_status[status].values())
+        end = None if limit is None else offset + limit
+        return [j.to_dict(include_result=False) for j in jobs[offset:end]]
+    
+    def iter_jobs(self, status: Optional[JobStatus] = None) -> Iterator[Job]:
+        """
+        Itera los jobs (sobre una copia de las referencias), opcionalmente filtrados por estado.
+        A diferencia de list_jobs(), no construye todos los diccionarios de golpe.
+        """
+        yield from tuple(self._jobs.values() if status is None else self._by_status[status].values())
     
     def cancel_job(self, job_id: str) -> bool:
         """
@@ -357,15 +674,17 @@ class JobManager:
         if not job:
             return False
         
-        if job.status == JobStatus.PENDING:
-            # Si está pendiente, simplemente marcar como cancelado
-            job.status = JobStatus.CANCELLED
+        if job.status is JobStatus.PENDING:
+            # Si está pendiente, retirarlo de la cola y marcarlo como cancelado
+            self._dequeue_pending(job)
+            self._set_status(job, JobStatus.CANCELLED)
             job.request_cancellation()
             job.updated_at = time.time()
+            self._mark_terminal(job)
             logger.info(f"Job cancelado (pendiente): {job_id}")
             return True
         
-        if job.status == JobStatus.PROCESSING:
+        if job.status is JobStatus.PROCESSING:
             # Si está en proceso, marcar para cancelación
             job.request_cancellation()
             logger.info(f"Job marcado para cancelación (en ejecución): {job_id}")
@@ -389,7 +708,8 @@ class JobManager:
             return {"success": False, "error": f"Job no encontrado: {job_id}"}
         
         # Si ya está en estado final, no hacer nada
-        if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.KILLED]:
+        # CANCELLED no cuenta: un job cancelado todavía puede pasar a KILLED
+        if job.status in _TERMINAL_STATES and job.status is not JobStatus.CANCELLED:
             return {
                 "success": False, 
                 "error": f"El job ya está en estado final: {job.status.value}",
@@ -400,10 +720,12 @@ class JobManager:
         job.request_cancellation()
         previous_status = job.status
         
-        if job.status == JobStatus.PENDING:
-            # Si está pendiente, simplemente marcar como killed
-            job.status = JobStatus.KILLED
+        if job.status is JobStatus.PENDING:
+            # Si está pendiente, retirarlo de la cola y marcarlo como killed
+            self._dequeue_pending(job)
+            self._set_status(job, JobStatus.KILLED)
             job.updated_at = time.time()
+            self._mark_terminal(job)
             job.error = "Job matado por el usuario (estaba en cola)"
             logger.info(f"Job matado (pendiente): {job_id}")
             return {
@@ -413,7 +735,7 @@ class JobManager:
                 "current_status": job.status.value
             }
         
-        if job.status == JobStatus.PROCESSING:
+        if job.status is JobStatus.PROCESSING:
             # Si está en ejecución, intentar cancelar la tarea
             if job._processing_task and not job._processing_task.done():
                 try:
@@ -431,8 +753,9 @@ class JobManager:
                     logger.error(f"Error cancelando job {job_id}: {e}")
             
             # Marcar como killed independientemente del resultado
-            job.status = JobStatus.KILLED
+            self._set_status(job, JobStatus.KILLED)
             job.updated_at = time.time()
+            self._mark_terminal(job)
             job.error = "Job matado por el usuario"
             logger.info(f"Job matado (en ejecución): {job_id}")
             return {
@@ -443,9 +766,10 @@ class JobManager:
             }
         
         # Si está cancelado, actualizar a killed
-        if job.status == JobStatus.CANCELLED:
-            job.status = JobStatus.KILLED
+        if job.status is JobStatus.CANCELLED:
+            self._set_status(job, JobStatus.KILLED)
             job.updated_at = time.time()
+            self._mark_terminal(job)
             logger.info(f"Job matado (previamente cancelado): {job_id}")
             return {
                 "success": True, 
@@ -458,70 +782,64 @@ class JobManager:
     
     def delete_job(self, job_id: str) -> bool:
         """Elimina un job."""
-        with self._lock:
-            if job_id in self._jobs:
-                del self._jobs[job_id]
-                logger.info(f"Job eliminado: {job_id}")
-                return True
-        return False
+        # pop() es una única operación atómica: no necesita el lock
+        if self._remove_job(job_id) is None:
+            return False
+        logger.info(f"Job eliminado: {job_id}")
+        return True
     
-    def _cleanup_old_jobs(self):
-        """Limpia jobs antiguos completados, fallidos, cancelados o matados."""
-        now = time.time()
-        max_age = 3600  # 1 hora
-        
-        to_delete = []
-        for job_id, job in self._jobs.items():
-            # Eliminar jobs completados/fallidos/cancelados/killed con más de 1 hora
-            if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.KILLED]:
-                if now - job.updated_at > max_age:
-                    to_delete.append(job_id)
-        
-        for job_id in to_delete:
-            del self._jobs[job_id]
-        
-        if to_delete:
-            logger.info(f"Limpiados {len(to_delete)} jobs antiguos")
+    def _set_status(self, job: Job, status: JobStatus):
+        """Cambia el estado de un job manteniendo el índice por estado."""
+        previous = job.status
+        if previous is status:
+            return
+        self._by_status[previous].pop(job.id, None)
+        job.status = status
+        if job.id in self._jobs:
+            self._by_status[status][job.id] = job
+        
+        # Los streams se enteran del cambio al instante (ej: cancel/kill de un job pendiente,
+        # que no pasa por update_progress) en lugar de esperar al siguiente heartbeat
+        if job._subscribers:
+            job._notify_subscribers(self._loop)
+    
+    def _remove_job(self, job_id: str) -> Optional[Job]:
+        """Quita un job del registro y del índice por estado."""
+        job = self._jobs.pop(job_id, None)
+        if job is not None:
+            self._by_status[job.status].pop(job_id, None)
+        return job
     
-    async def process_job(
-        self,
-        job: Job,
-        processor: Callable[[Job, Callable], Any]
-    ):
+    def _mark_terminal(self, job: Job):
+        """Registra un job que ha llegado a un estado final para su limpieza posterior."""
+        if job.status in _TERMINAL_STATES:
+            self._terminal_queue.append((job.updated_at, job.id))
+    
+    def _cleanup_old_jobs(self):
         """
-        Procesa un job ejecutando la función processor.
-        
-        Args:
-            job: El job a procesar
-            processor: Función que procesa el job. Recibe el job y una función de progreso.
+        Limpia jobs antiguos completados, fallidos, cancelados o matados.
+        Solo recorre el principio de la cola: O(k) para k jobs expirados.
         """
-        try:
-            job.status = JobStatus.PROCESSING
-            job.update_progress("starting", 0, "Iniciando procesamiento...")
-            
-            # Función de progreso que actualiza el job
-            def progress_callback(stage: str, percent: int, message: str):
-                job.update_progress(stage, percent, message)
-            
-            # Ejecutar el procesador
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,  # ThreadPoolExecutor por defecto
-                lambda: processor(job, progress_callback)
-            )
-            
-            # Marcar como completado
-            job.result = result
-            job.status = JobStatus.COMPLETED
-            job.update_progress("completed", 100, "Procesamiento completado")
-            logger.info(f"Job completado: {job.id}")
-            
-        except Exception as e:
-            logger.error(f"Error procesando job {job.id}: {e}")
-            job.status = JobStatus.FAILED
-            job.error = str(e)
-            job.update_progress("error", 0, f"Error: {str(e)}")
+        queue = self._terminal_queue
+        cutoff = time.time() - JOB_MAX_AGE
+        removed = 0
+        
+        while queue and queue[0][0] < cutoff:
+            _, job_id = queue.popleft()
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue  # Ya eliminado (delete_job o entrada duplicada)
+            if job.updated_at >= cutoff:
+                # Se actualizó después de registrarse (ej: cancelled -> killed): volver a encolar
+                queue.append((job.updated_at, job_id))
+                continue
+            self._remove_job(job_id)
+            removed += 1
+        
+        if removed:
+            logger.info(f"Limpiados {removed} jobs antiguos")
     
-    async def stream_progress(self, job_id: str) -> AsyncGenerator[str, None]:
+    async def stream_progress(self, job_id: str) -> AsyncGenerator[bytes, None]:
         """
         Genera un stream de eventos SSE con el progreso del job.
         
@@ -530,73 +848,70 @@ class JobManager:
         """
         job = self._jobs.get(job_id)
         if not job:
-            yield f"event: error\ndata: {{'error': 'Job no encontrado'}}\n\n"
+            yield _SSE_NOT_FOUND
             return
         
-        # Cola para recibir actualizaciones de progreso
-        queue = asyncio.Queue()
-        
-        def on_progress(progress: JobProgress):
-            try:
-                asyncio.get_event_loop().call_soon_threadsafe(
-                    queue.put_nowait, progress
-                )
-            except Exception as e:
-                logger.error(f"Error enviando progreso a queue: {e}")
-        
-        # Registrar callback
-        job.add_progress_callback(on_progress)
+        # El heartbeat vive en el loop del manager (los de otros loops se despiertan desde él)
+        if self._heartbeat_task is None and asyncio.get_running_loop() is self._loop:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
         
+        # Suscripción propia del stream: las ráfagas de actualizaciones se agrupan en un solo frame
+        event = job.subscribe()
         try:
             # Enviar estado inicial
-            yield f"event: progress\ndata: {self._progress_to_json(job.progress)}\n\n"
+            last = job.progress
+            yield self._progress_frame(last)
+            last_emit = time.monotonic()
             
             # Esperar actualizaciones hasta que el job termine
-            while job.status in [JobStatus.PENDING, JobStatus.PROCESSING]:
-                try:
-                    progress = await asyncio.wait_for(queue.get(), timeout=1.0)
-                    yield f"event: progress\ndata: {self._progress_to_json(progress)}\n\n"
-                except asyncio.TimeoutError:
-                    # Enviar heartbeat para mantener la conexión viva
-                    yield f"event: heartbeat\ndata: {{'timestamp': {time.time()}}}\n\n"
-                    continue
+            while job.status in _ACTIVE_STATES:
+                # Lo despierta un progreso nuevo o el heartbeat compartido (sin temporizador propio)
+                await event.wait()
+                event.clear()
+            
+                progress = job.progress
+                now = time.monotonic()
+                if progress is not last:
+                    last = progress
+                    yield self._progress_frame(progress)
+                    last_emit = now
+                elif now - last_emit >= SSE_HEARTBEAT_INTERVAL - _SSE_HEARTBEAT_TICK:
+                    # Heartbeat si el siguiente tick ya superaría el intervalo sin eventos
+                    yield _SSE_HEARTBEAT % time.time()
+                    last_emit = now
             
             # Enviar resultado final
-            if job.status == JobStatus.COMPLETED:
-                result_data = {
-                    "status": "completed",
-                    "result": job.result
-                }
-                yield f"event: completed\ndata: {self._dict_to_json(result_data)}\n\n"
-            elif job.status == JobStatus.FAILED:
-                error_data = {
-                    "status": "failed",
-                    "error": job.error
-                }
-                yield f"event: error\ndata: {self._dict_to_json(error_data)}\n\n"
-            elif job.status == JobStatus.CANCELLED:
-                yield f"event: cancelled\ndata: {{'status': 'cancelled'}}\n\n"
-            elif job.status == JobStatus.KILLED:
-                yield f"event: killed\ndata: {{'status': 'killed', 'error': '{job.error}'}}\n\n"
-                
+            if job.status is JobStatus.COMPLETED:
+                # El blob descomprimido ya es el JSON del resultado: se inserta tal cual
+                yield _SSE_COMPLETED % (job.result_json() or b"null")
+            elif job.status is JobStatus.FAILED:
+                yield _SSE_FAILED % orjson.dumps(job.error)
+            elif job.status is JobStatus.CANCELLED:
+                yield _SSE_CANCELLED
+            elif job.status is JobStatus.KILLED:
+                yield _SSE_KILLED % orjson.dumps(job.error)
         finally:
-            job.remove_progress_callback(on_progress)
-    
-    def _progress_to_json(self, progress: JobProgress) -> str:
-        """Convierte JobProgress a JSON."""
-        import json
-        return json.dumps({
-            "stage": progress.stage,
-            "percent": progress.percent,
-            "message": progress.message,
-            "timestamp": progress.timestamp
-        })
-    
-    def _dict_to_json(self, data: dict) -> str:
-        """Convierte diccionario a JSON."""
-        import json
-        return json.dumps(data)
+            job.unsubscribe(event)
+    
+    @staticmethod
+    def _progress_frame(progress: JobProgress) -> bytes:
+        """
+        Genera el evento SSE de progreso completo (bytes) en una sola operación de formato,
+        sin diccionario intermedio. stage/message se escapan como strings JSON con orjson.
+        """
+        return _SSE_PROGRESS % (
+            _json_str(progress.stage),
+            progress.percent,
+            _json_str(progress.message),
+            progress.timestamp
+        )
 
 
 # Instancia global del JobManager
-job_manager = JobManager()
\ No newline at end of file
+# Por defecto procesa a la vez tantos jobs como el tamaño máximo de lote (TTS_MAX_BATCH_SIZE),
+# para que el BatchCoalescer pueda agrupar jobs concurrentes; las llamadas al modelo siguen
+# serializadas por el semáforo de GPU de job_processors. Con TTS_MAX_BATCH_SIZE=1 (sin batching)
+# o JOB_MAX_CONCURRENT=1 los jobs se procesan de uno en uno
+job_manager = JobManager(max_concurrent=max(1, int(
+    os.getenv("JOB_MAX_CONCURRENT", os.getenv("TTS_MAX_BATCH_SIZE", "8"))
+)))
\ No newline at end of file
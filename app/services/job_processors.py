@@ -1,134 +1,431 @@
 """
 Job Processors - Procesadores de jobs para generación de audio.
-Cada tipo de job tiene su propio procesador que maneja el progreso.
+Los jobs de generación directa (Custom Voice, Voice Design) se describen en JOB_SPECS y
+comparten un único procesador; los de clonación tienen el suyo, con helpers comunes.
 """
 
+import io
+import os
 import time
+import hashlib
+import functools
 import logging
-from typing import Callable, Dict, Any
+import zlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Hashable, Optional
 
-from app.services.job_manager import Job
-from app.dependencies import get_tts_service
+# Codec base64 vectorizado (SIMD) si está disponible; misma API que la stdlib
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+import httpx
+import orjson
+
+from app.schemas.requests import CustomVoiceRequest, VoiceDesignRequest, VoiceCloneRequest
+from app.services.job_manager import Job, RESULT_COMPRESSION_LEVEL
+from app.services.response_cache import ResponseCache
+from app.services.batch_coalescer import BatchCoalescer
+from app.dependencies import get_tts_service, get_voice_manager
 
 logger = logging.getLogger(__name__)
 
+# Micro-batching: peticiones concurrentes del mismo tipo se agrupan en una sola pasada del modelo
+TTS_MAX_BATCH_SIZE = int(os.getenv("TTS_MAX_BATCH_SIZE", "8"))
+TTS_BATCH_WINDOW = float(os.getenv("TTS_BATCH_WINDOW_MS", "20")) / 1000.0
+
+
+def _batch_key(model_size, generation_params: Dict[str, Any]) -> Hashable:
+    """Clave de agrupación: solo comparten lote peticiones con el mismo modelo y kwargs de generación."""
+    return (model_size, tuple(sorted((generation_params or {}).items())))
+
+
+def _run_custom_voice_batch(key: Hashable, requests: List[Any]) -> List[Any]:
+    """Ejecuta un lote de CustomVoiceRequest con una sola llamada al modelo."""
+    model_size, generation_items = key
+    return get_tts_service().generate_custom_voice_batch(
+        texts=[r.text for r in requests],
+        speakers=[r.speaker for r in requests],
+        languages=[r.language for r in requests],
+        instructions=[r.instruction for r in requests],
+        model_size=model_size,
+        generation_params=dict(generation_items)
+    )
+
+
+def _run_voice_design_batch(key: Hashable, requests: List[Any]) -> List[Any]:
+    """Ejecuta un lote de VoiceDesignRequest con una sola llamada al modelo."""
+    model_size, generation_items = key
+    return get_tts_service().generate_voice_design_batch(
+        texts=[r.text for r in requests],
+        voice_descriptions=[r.voice_description for r in requests],
+        languages=[r.language for r in requests],
+        model_size=model_size,
+        generation_params=dict(generation_items)
+    )
+
+
+class _RefPromptCache:
+    """
+    LRU thread-safe de prompts de clonación por audio de referencia.
+    Guarda el prompt_id registrado en el servicio TTS; al expulsar una entrada
+    se libera también el prompt del servicio para que la memoria quede acotada.
+    
+    Los prompts en uso se cuentan (acquire/release): si se expulsa uno que otro job
+    está usando, su liberación se aplaza hasta el último release.
+    """
+    
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._in_use: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, key: Hashable) -> Optional[str]:
+        """
+        Devuelve el prompt_id cacheado (si sigue registrado en el servicio) y lo marca en uso.
+        Cada acquire que devuelve un id debe ir seguido de release(prompt_id).
+        """
+        tts_service = get_tts_service()
+        with self._lock:
+            prompt_id = self._entries.get(key)
+            if prompt_id is None:
+                return None
+            if not tts_service.has_prompt(prompt_id):
+                # El servicio se limpió (cleanup): la entrada ya no es válida
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._in_use[prompt_id] = self._in_use.get(prompt_id, 0) + 1
+            return prompt_id
+    
+    def put(self, key: Hashable, prompt_id: str, acquire: bool = False):
+        """
+        Registra un prompt_id, expulsando (y liberando) el menos usado si hace falta.
+        Con acquire=True además lo marca en uso, como acquire().
+        """
+        with self._lock:
+            if acquire:
+                self._in_use[prompt_id] = self._in_use.get(prompt_id, 0) + 1
+            dropped = []
+            if self._capacity > 0:
+                previous_id = self._entries.get(key)
+                if previous_id is not None and previous_id != prompt_id:
+                    dropped.append(previous_id)
+                self._entries[key] = prompt_id
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._capacity:
+                dropped.append(self._entries.popitem(last=False)[1])
+            # Los que siguen en uso se liberan en su último release()
+            to_release = [pid for pid in dropped if self._is_orphan(pid)]
+        self._release_from_service(to_release)
+    
+    def release(self, prompt_id: str):
+        """Marca el fin de un uso; libera el prompt si ya no está en la caché (expulsado mientras se usaba)."""
+        to_release = []
+        with self._lock:
+            remaining = self._in_use.get(prompt_id, 0) - 1
+            if remaining > 0:
+                self._in_use[prompt_id] = remaining
+                return
+            self._in_use.pop(prompt_id, None)
+            if self._is_orphan(prompt_id):
+                to_release.append(prompt_id)
+        self._release_from_service(to_release)
+    
+    def _is_orphan(self, prompt_id: str) -> bool:
+        """Prompt sin entradas en la caché ni usos activos (se llama con el lock tomado)."""
+        return prompt_id not in self._in_use and prompt_id not in self._entries.values()
+    
+    @staticmethod
+    def _release_from_service(prompt_ids: List[str]):
+        """Elimina los prompts del servicio TTS (fuera del lock de la caché)."""
+        if prompt_ids:
+            tts_service = get_tts_service()
+            for prompt_id in prompt_ids:
+                tts_service.release_prompt(prompt_id)
+
+
+def _sampled_audio_key(audio_bytes: bytes) -> bytes:
+    """Hash BLAKE2b de ~1024 bytes muestreados a lo largo del audio (más la longitud)."""
+    step = max(1, len(audio_bytes) // 1024)
+    digest = hashlib.blake2b(audio_bytes[::step], digest_size=16)
+    digest.update(len(audio_bytes).to_bytes(8, "little"))
+    return digest.digest()
+
+
+# Caché de prompts de clonación: evita re-codificar el mismo audio de referencia en cada job
+_REF_EMBED_CACHE = _RefPromptCache(capacity=int(os.getenv("VOICE_EMBED_CACHE_CAPACITY", "50")))
+
+
+_custom_voice_coalescer = BatchCoalescer(
+    "custom_voice", _run_custom_voice_batch, TTS_MAX_BATCH_SIZE, TTS_BATCH_WINDOW
+)
+_voice_design_coalescer = BatchCoalescer(
+    "voice_design", _run_voice_design_batch, TTS_MAX_BATCH_SIZE, TTS_BATCH_WINDOW
+)
 
-def process_custom_voice_job(job: Job, progress_callback: Callable[[str, int, str], None]) -> Dict[str, Any]:
+
+# Caché de resultados por contenido: un job idéntico (tipo, texto, voz, idioma, parámetros
+# y formato) devuelve el audio ya generado sin pasar por el modelo. Los resultados se guardan
+# comprimidos (como en Job) y la caché se acota también por bytes
+job_result_cache = ResponseCache(
+    max_size=int(os.getenv("JOB_RESULT_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("JOB_RESULT_CACHE_TTL", "3600")),
+    max_bytes=int(float(os.getenv("JOB_RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024)
+)
+
+
+def _result_key(job_type: str, data: Dict[str, Any]) -> str:
+    """Hash BLAKE2b del request_data canónico (ya validado) junto con el tipo de job."""
+    payload = orjson.dumps({"job_type": job_type, **data}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _with_result_cache(processor: Callable) -> Callable:
+    """Envuelve un procesador para servir desde job_result_cache los jobs repetidos."""
+    
+    @functools.wraps(processor)
+    def wrapper(job: Job, progress_callback: Callable[[str, int, str], None]) -> Dict[str, Any]:
+        key = _result_key(job.job_type, job.request_data)
+        cached = job_result_cache.get(key)
+        if cached is not None:
+            progress_callback("cache_hit", 100, "Audio servido desde caché")
+            blob, audio_bytes = cached
+            result = orjson.loads(zlib.decompress(blob))
+            if audio_bytes is not None:
+                result["audio_bytes"] = audio_bytes
+            result["cached"] = True
+            return result
+        
+        result = processor(job, progress_callback)
+        # audio_bytes (binary_output) no es serializable a JSON: se guarda aparte
+        json_part = {k: v for k, v in result.items() if k != "audio_bytes"}
+        audio_bytes = result.get("audio_bytes")
+        blob = zlib.compress(orjson.dumps(json_part), RESULT_COMPRESSION_LEVEL)
+        # Las voces clonadas se etiquetan para invalidarlas al editar o borrar la voz
+        job_result_cache.set(
+            key, (blob, audio_bytes),
+            tag=job.request_data.get("voice_id"),
+            size=len(blob) + len(audio_bytes or b"")
+        )
+        return result
+    
+    return wrapper
+
+
+# Esquemas con los que se valida request_data al crear el job (antes de encolarlo)
+JOB_SCHEMAS = {
+    "custom_voice": CustomVoiceRequest,
+    "voice_design": VoiceDesignRequest,
+    "voice_clone_url": VoiceCloneRequest,
+}
+
+# Campos obligatorios de los jobs que trabajan con el dict sin esquema Pydantic
+_REQUIRED_FIELDS = {
+    "voice_clone_url": ("ref_audio_url",),
+    "voice_clone_file": ("ref_audio_base64", "text"),
+    "cloned_voice_generate": ("voice_id", "text"),
+}
+
+
+def validate_request_data(job_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Procesa un job de Custom Voice.
+    Valida request_data al crear el job, para que los workers solo reciban jobs válidos.
+    
+    Args:
+        job_type: Tipo de job
+        data: Datos del request tal como llegan en la API
+    
+    Returns:
+        Datos validados listos para guardar en el job
+    
+    Raises:
+        ValueError: Si los datos no son válidos (incluye ValidationError de Pydantic)
+    """
+    schema = JOB_SCHEMAS.get(job_type)
+    if schema is not None:
+        request = schema(**data)
+        validated = request.model_dump()
+        # Los kwargs de generación se calculan una vez aquí y no en el worker
+        validated["_generation_kwargs"] = request.to_generation_kwargs()
+        # Opción de transporte, ajena al esquema del request
+        validated["binary_output"] = bool(data.get("binary_output", False))
+        data = validated
+    
+    for name in _REQUIRED_FIELDS.get(job_type, ()):
+        if not data.get(name):
+            raise ValueError(f"Se requiere {name}")
+    
+    if job_type == "cloned_voice_generate" and data["voice_id"] not in get_voice_manager().voices:
+        raise ValueError(f"Voz clonada no encontrada: {data['voice_id']}")
+    
+    return data
+
+
+def _trusted_request(schema, data: Dict[str, Any]):
+    """Reconstruye sin validar un request ya validado por validate_request_data."""
+    fields = {k: data[k] for k in schema.model_fields if k in data}
+    return schema.model_construct(**fields), data["_generation_kwargs"]
+
+
+@dataclass(frozen=True, slots=True)
+class JobSpec:
+    """Describe un job de generación directa: request validado → lote en el modelo → audio."""
+    request_cls: type
+    coalescer: BatchCoalescer
+    generating_message: str
+
+
+JOB_SPECS = {
+    "custom_voice": JobSpec(
+        CustomVoiceRequest, _custom_voice_coalescer, "Generando audio con voz personalizada..."
+    ),
+    "voice_design": JobSpec(
+        VoiceDesignRequest, _voice_design_coalescer, "Diseñando y generando voz..."
+    ),
+}
+
+
+def _build_result(
+    tts_service,
+    progress_callback: Callable[[str, int, str], None],
+    audio_result,
+    output_format: str,
+    start_ns: int,
+    percent: int = 85,
+    binary_output: bool = False
+) -> Dict[str, Any]:
+    """
+    Codifica el audio generado y construye el diccionario de resultado del job.
+    Con binary_output el audio va en "audio_bytes" (sin base64); el JobManager lo guarda
+    aparte del JSON del resultado y se descarga por /jobs/{job_id}/audio.
+    """
+    progress_callback("encoding", percent, "Codificando audio...")
+    
+    if binary_output:
+        audio_field = ("audio_bytes", tts_service.audio_to_bytes(audio_result, output_format))
+    else:
+        audio_field = ("audio_base64", tts_service.audio_to_base64(audio_result, output_format))
+    
+    processing_time = (time.perf_counter_ns() - start_ns) / 1e9
+    
+    return {
+        "success": True,
+        audio_field[0]: audio_field[1],
+        "sample_rate": audio_result.sample_rate,
+        "duration_seconds": audio_result.duration_seconds,
+        "model_used": audio_result.model_used,
+        "processing_time_seconds": processing_time
+    }
+
+
+def _run_tts_job(job: Job, progress_callback: Callable[[str, int, str], None], spec: JobSpec) -> Dict[str, Any]:
+    """
+    Procesa un job descrito por un JobSpec (Custom Voice, Voice Design).
     
     Args:
         job: El job a procesar
         progress_callback: Función para reportar progreso (stage, percent, message)
+        spec: Descripción del tipo de job
     
     Returns:
         Diccionario con el resultado del procesamiento
     """
-    from app.schemas.requests import CustomVoiceRequest
-    
-    data = job.request_data
     tts_service = get_tts_service()
     
-    try:
-        progress_callback("validating", 5, "Validando parámetros...")
-        
-        # Crear request para validación
-        request = CustomVoiceRequest(**data)
-        
-        progress_callback("loading_model", 15, "Cargando modelo de Custom Voice...")
-        
-        progress_callback("preparing", 25, "Preparando generación...")
-        
-        progress_callback("generating", 50, "Generando audio con voz personalizada...")
-        start_time = time.time()
-        
-        # Generar audio
-        audio_result = tts_service.generate_custom_voice(
-            text=request.text,
-            speaker=request.speaker,
-            language=request.language,
-            instruction=request.instruction,
-            generation_params=request.to_generation_kwargs()
-        )
-        
-        progress_callback("encoding", 80, "Codificando audio a base64...")
-        
-        # Convertir a base64
-        audio_base64 = tts_service.audio_to_base64(audio_result, request.output_format)
-        
-        processing_time = time.time() - start_time
-        
-        progress_callback("finalizing", 95, "Finalizando...")
-        
-        return {
-            "success": True,
-            "audio_base64": audio_base64,
-            "sample_rate": audio_result.sample_rate,
-            "duration_seconds": audio_result.duration_seconds,
-            "model_used": audio_result.model_used,
-            "processing_time_seconds": processing_time
-        }
-        
-    except Exception as e:
-        logger.error(f"Error en process_custom_voice_job: {e}")
-        raise
+    progress_callback("validating", 5, "Validando parámetros...")
+    
+    # Request validado al crear el job: se reconstruye sin volver a validar
+    request, generation_kwargs = _trusted_request(spec.request_cls, job.request_data)
+    
+    progress_callback("generating", 50, spec.generating_message)
+    start_ns = time.perf_counter_ns()
+    
+    # Generar audio (agrupado con otros jobs concurrentes compatibles)
+    audio_result = spec.coalescer.submit(_batch_key(None, generation_kwargs), request)
+    
+    return _build_result(
+        tts_service, progress_callback, audio_result, request.output_format, start_ns, 80,
+        binary_output=job.request_data.get("binary_output", False)
+    )
 
 
-def process_voice_design_job(job: Job, progress_callback: Callable[[str, int, str], None]) -> Dict[str, Any]:
+def _download_ref_audio(url: str) -> bytes:
+    """Descarga el audio de referencia en streaming, fuera del semáforo de GPU."""
+    buffer = io.BytesIO()
+    with httpx.Client(timeout=30.0, follow_redirects=True) as client:
+        with client.stream("GET", url) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                buffer.write(chunk)
+    return buffer.getvalue()
+
+
+def _prompt_from_bytes(
+    tts_service,
+    ref_audio_bytes: bytes,
+    ref_text: str,
+    model_size: str,
+    alias_key: Optional[Hashable] = None
+) -> str:
     """
-    Procesa un job de Voice Design.
+    Obtiene el prompt de clonación para un audio de referencia, reutilizándolo si el
+    mismo contenido ya se procesó con el mismo modelo.
     
     Args:
-        job: El job a procesar
-        progress_callback: Función para reportar progreso
+        tts_service: Servicio TTS
+        ref_audio_bytes: Contenido del audio de referencia
+        ref_text: Texto correspondiente al audio
+        model_size: Tamaño del modelo
+        alias_key: Clave adicional con la que registrar el prompt (p. ej. la URL de origen)
     
     Returns:
-        Diccionario con el resultado
+        ID del prompt registrado en el servicio TTS, en uso: liberar con _REF_EMBED_CACHE.release
     """
-    from app.schemas.requests import VoiceDesignRequest
+    cache_key = ("audio", _sampled_audio_key(ref_audio_bytes), ref_text, model_size)
+    prompt_id = _REF_EMBED_CACHE.acquire(cache_key)
+    if prompt_id is None:
+        prompt_id = tts_service.create_voice_clone_prompt_from_file(
+            ref_audio_file=ref_audio_bytes,
+            ref_text=ref_text,
+            model_size=model_size
+        )
+        _REF_EMBED_CACHE.put(cache_key, prompt_id, acquire=True)
+    if alias_key is not None:
+        _REF_EMBED_CACHE.put(alias_key, prompt_id)
+    return prompt_id
+
+
+def _generate_voice_clone_result(
+    tts_service,
+    progress_callback: Callable[[str, int, str], None],
+    prompt_id: str,
+    text: str,
+    language: str,
+    model_size: str,
+    output_format: str,
+    generation_params: Optional[Dict[str, Any]] = None,
+    binary_output: bool = False
+) -> Dict[str, Any]:
+    """Genera el audio clonado con un prompt ya registrado y construye el resultado del job."""
+    progress_callback("generating", 65, "Generando audio clonado...")
+    start_ns = time.perf_counter_ns()
     
-    data = job.request_data
-    tts_service = get_tts_service()
+    audio_result = tts_service.generate_voice_clone(
+        text=text,
+        voice_clone_prompt_id=prompt_id,
+        language=language,
+        model_size=model_size,
+        generation_params=generation_params
+    )
     
-    try:
-        progress_callback("validating", 5, "Validando parámetros...")
-        
-        request = VoiceDesignRequest(**data)
-        
-        progress_callback("loading_model", 15, "Cargando modelo de Voice Design...")
-        
-        progress_callback("preparing", 25, "Preparando descripción de voz...")
-        
-        progress_callback("generating", 50, "Diseñando y generando voz...")
-        start_time = time.time()
-        
-        audio_result = tts_service.generate_voice_design(
-            text=request.text,
-            voice_description=request.voice_description,
-            language=request.language,
-            generation_params=request.to_generation_kwargs()
-        )
-        
-        progress_callback("encoding", 80, "Codificando audio...")
-        
-        audio_base64 = tts_service.audio_to_base64(audio_result, request.output_format)
-        
-        processing_time = time.time() - start_time
-        
-        progress_callback("finalizing", 95, "Finalizando...")
-        
-        return {
-            "success": True,
-            "audio_base64": audio_base64,
-            "sample_rate": audio_result.sample_rate,
-            "duration_seconds": audio_result.duration_seconds,
-            "model_used": audio_result.model_used,
-            "processing_time_seconds": processing_time
-        }
-        
-    except Exception as e:
-        logger.error(f"Error en process_voice_design_job: {e}")
-        raise
+    return _build_result(
+        tts_service, progress_callback, audio_result, output_format, start_ns, binary_output=binary_output
+    )
 
 
 def process_voice_clone_url_job(job: Job, progress_callback: Callable[[str, int, str], None]) -> Dict[str, Any]:
@@ -142,61 +439,41 @@ def process_voice_clone_url_job(job: Job, progress_callback: Callable[[str, int,
     Returns:
         Diccionario con el resultado
     """
-    from app.schemas.requests import VoiceCloneRequest
-    
     data = job.request_data
     tts_service = get_tts_service()
     
+    progress_callback("validating", 5, "Validando parámetros...")
+    
+    request, generation_kwargs = _trusted_request(VoiceCloneRequest, data)
+    
+    # Si la URL ya se procesó con este modelo no hace falta ni descargarla
+    url_key = ("url", request.ref_audio_url, request.ref_text, request.model_size)
+    prompt_id = _REF_EMBED_CACHE.acquire(url_key)
     try:
-        progress_callback("validating", 5, "Validando parámetros...")
-        
-        request = VoiceCloneRequest(**data)
-        
-        if not request.ref_audio_url:
-            raise ValueError("Se requiere ref_audio_url")
-        
-        progress_callback("loading_model", 15, "Cargando modelo de Voice Clone...")
-        
-        progress_callback("downloading", 25, "Descargando audio de referencia...")
-        
-        progress_callback("creating_prompt", 35, "Creando prompt de clonación...")
-        
-        # Crear prompt de clonación
-        prompt_id = tts_service.create_voice_clone_prompt(
-            ref_audio_path=request.ref_audio_url,
-            ref_text=request.ref_text
-        )
-        
-        progress_callback("generating", 60, "Generando audio clonado...")
-        start_time = time.time()
+        if prompt_id is None:
+            progress_callback("downloading", 15, "Descargando audio de referencia...")
+            ref_audio_bytes = _download_ref_audio(request.ref_audio_url)
+        
+        if prompt_id is None:
+            progress_callback("creating_prompt", 45, "Convirtiendo audio y creando prompt de clonación...")
+            prompt_id = _prompt_from_bytes(
+                tts_service, ref_audio_bytes, request.ref_text, request.model_size, alias_key=url_key
+            )
         
-        audio_result = tts_service.generate_voice_clone(
+        return _generate_voice_clone_result(
+            tts_service,
+            progress_callback,
+            prompt_id,
             text=request.text,
-            voice_clone_prompt_id=prompt_id,
             language=request.language,
-            generation_params=request.to_generation_kwargs()
+            model_size=request.model_size,
+            output_format=request.output_format,
+            generation_params=generation_kwargs,
+            binary_output=data.get("binary_output", False)
         )
-        
-        progress_callback("encoding", 85, "Codificando audio...")
-        
-        audio_base64 = tts_service.audio_to_base64(audio_result, request.output_format)
-        
-        processing_time = time.time() - start_time
-        
-        progress_callback("finalizing", 95, "Finalizando...")
-        
-        return {
-            "success": True,
-            "audio_base64": audio_base64,
-            "sample_rate": audio_result.sample_rate,
-            "duration_seconds": audio_result.duration_seconds,
-            "model_used": audio_result.model_used,
-            "processing_time_seconds": processing_time
-        }
-        
-    except Exception as e:
-        logger.error(f"Error en process_voice_clone_url_job: {e}")
-        raise
+    finally:
+        if prompt_id is not None:
+            _REF_EMBED_CACHE.release(prompt_id)
 
 
 def process_voice_clone_file_job(job: Job, progress_callback: Callable[[str, int, str], None]) -> Dict[str, Any]:
@@ -213,70 +490,42 @@ def process_voice_clone_file_job(job: Job, progress_callback: Callable[[str, int
     data = job.request_data
     tts_service = get_tts_service()
     
+    progress_callback("validating", 5, "Validando parámetros...")
+    
+    # Extraer datos del archivo base64
+    ref_audio_base64 = data.get("ref_audio_base64")
+    ref_text = data.get("ref_text")
+    text = data.get("text")
+    language = data.get("language", "Spanish")
+    output_format = data.get("output_format", "wav")
+    model_size = data.get("model_size", "0.6B")
+    
+    progress_callback("decoding", 15, "Decodificando audio...")
+    
+    # Decodificar base64
     try:
-        progress_callback("validating", 5, "Validando parámetros...")
-        
-        # Extraer datos del archivo base64
-        ref_audio_base64 = data.get("ref_audio_base64")
-        ref_text = data.get("ref_text")
-        text = data.get("text")
-        language = data.get("language", "Spanish")
-        output_format = data.get("output_format", "wav")
-        model_size = data.get("model_size", "0.6B")
-        generation_params = data.get("generation_params", {})
-        
-        if not ref_audio_base64:
-            raise ValueError("Se requiere ref_audio_base64")
-        
-        import base64
-        
-        progress_callback("decoding", 15, "Decodificando audio...")
-        
-        # Decodificar base64
-        try:
-            if "," in ref_audio_base64:
-                ref_audio_base64 = ref_audio_base64.split(",")[1]
-            ref_audio_bytes = base64.b64decode(ref_audio_base64)
-        except Exception as e:
-            raise ValueError(f"Error decodificando audio base64: {e}")
-        
-        progress_callback("loading_model", 25, "Cargando modelo de Voice Clone...")
-        
-        progress_callback("converting", 35, "Convirtiendo audio a formato WAV...")
-        
-        progress_callback("creating_prompt", 45, "Creando prompt de clonación...")
-        
-        progress_callback("generating", 65, "Generando audio clonado...")
-        start_time = time.time()
-        
-        audio_result = tts_service.generate_voice_clone_from_file(
+        if "," in ref_audio_base64:
+            ref_audio_base64 = ref_audio_base64.split(",")[1]
+        ref_audio_bytes = base64.b64decode(ref_audio_base64, validate=False)
+    except Exception as e:
+        raise ValueError(f"Error decodificando audio base64: {e}")
+    
+    progress_callback("creating_prompt", 45, "Convirtiendo audio y creando prompt de clonación...")
+    prompt_id = _prompt_from_bytes(tts_service, ref_audio_bytes, ref_text, model_size)
+    
+    try:
+        return _generate_voice_clone_result(
+            tts_service,
+            progress_callback,
+            prompt_id,
             text=text,
-            ref_audio_file=ref_audio_bytes,
-            ref_text=ref_text,
             language=language,
-            model_size=model_size
+            model_size=model_size,
+            output_format=output_format,
+            binary_output=data.get("binary_output", False)
         )
-        
-        progress_callback("encoding", 85, "Codificando audio...")
-        
-        audio_base64 = tts_service.audio_to_base64(audio_result, output_format)
-        
-        processing_time = time.time() - start_time
-        
-        progress_callback("finalizing", 95, "Finalizando...")
-        
-        return {
-            "success": True,
-            "audio_base64": audio_base64,
-            "sample_rate": audio_result.sample_rate,
-            "duration_seconds": audio_result.duration_seconds,
-            "model_used": audio_result.model_used,
-            "processing_time_seconds": processing_time
-        }
-        
-    except Exception as e:
-        logger.error(f"Error en process_voice_clone_file_job: {e}")
-        raise
+    finally:
+        _REF_EMBED_CACHE.release(prompt_id)
 
 
 def process_cloned_voice_generate_job(job: Job, progress_callback: Callable[[str, int, str], None]) -> Dict[str, Any]:
@@ -290,132 +539,96 @@ def process_cloned_voice_generate_job(job: Job, progress_callback: Callable[[str
     Returns:
         Diccionario con el resultado
     """
-    from app.services.voice_manager import VoiceManager
-    
     data = job.request_data
     tts_service = get_tts_service()
-    voice_manager = VoiceManager(storage_dir="/app/data")
+    voice_manager = get_voice_manager()
     
-    try:
-        progress_callback("validating", 5, "Validando parámetros...")
-        
-        voice_id = data.get("voice_id")
-        text = data.get("text")
-        language = data.get("language")
-        output_format = data.get("output_format", "wav")
-        model_size = data.get("model_size", "1.7B")
-        use_voice_defaults = data.get("use_voice_defaults", True)
-        generation_params = data.get("generation_params", {})
-        
-        progress_callback("loading_voice", 15, "Cargando voz clonada...")
-        
-        voice = voice_manager.get_voice(voice_id)
-        if not voice:
-            raise ValueError(f"Voz clonada no encontrada: {voice_id}")
+    progress_callback("validating", 5, "Validando parámetros...")
+    
+    voice_id = data.get("voice_id")
+    text = data.get("text")
+    language = data.get("language")
+    output_format = data.get("output_format", "wav")
+    model_size = data.get("model_size", "1.7B")
+    use_voice_defaults = data.get("use_voice_defaults", True)
+    generation_params = data.get("generation_params", {})
+    
+    progress_callback("loading_voice", 15, "Cargando voz clonada...")
+    
+    voice = voice_manager.get_voice(voice_id)
+    if not voice:
+        raise ValueError(f"Voz clonada no encontrada: {voice_id}")
+    
+    # Intentar obtener el prompt de memoria
+    prompt_data = voice_manager.get_prompt(voice_id)
+    
+    # Si no está en memoria, recrearlo desde el audio de referencia
+    if not prompt_data:
+        logger.info("Prompt no está en memoria para voz %s, recreando desde audio de referencia...", voice_id)
+        progress_callback("recreating_prompt", 25, "Recreando prompt de voz desde audio de referencia...")
         
-        # Intentar obtener el prompt de memoria
-        prompt_data = voice_manager.get_prompt(voice_id)
+        # Verificar si tenemos el audio de referencia guardado
+        storage_dir = voice_manager.storage_dir
+        voice_audio_path = storage_dir / "voice_audio" / f"{voice_id}.wav"
         
-        # Si no está en memoria, recrearlo desde el audio de referencia
-        if not prompt_data:
-            logger.info(f"Prompt no está en memoria para voz {voice_id}, recreando desde audio de referencia...")
-            progress_callback("recreating_prompt", 25, "Recreando prompt de voz desde audio de referencia...")
+        if voice_audio_path.exists():
+            logger.info("Audio de referencia encontrado en: %s", voice_audio_path)
             
-            # Verificar si tenemos el audio de referencia guardado
-            import os
-            from pathlib import Path
+            # Recrear el prompt usando el servicio TTS
+            temp_prompt_id = tts_service.create_voice_clone_prompt(
+                ref_audio_path=str(voice_audio_path),
+                ref_text=voice.ref_text,
+                model_size=model_size
+            )
             
-            storage_dir = Path("/app/data")
-            voice_audio_path = storage_dir / "voice_audio" / f"{voice_id}.wav"
+            # Obtener el prompt recién creado
+            prompt_data = tts_service._voice_clone_prompts.get(temp_prompt_id)
             
-            if voice_audio_path.exists():
-                logger.info(f"Audio de referencia encontrado en: {voice_audio_path}")
-                
-                # Recrear el prompt usando el servicio TTS
-                temp_prompt_id = tts_service.create_voice_clone_prompt(
-                    ref_audio_path=str(voice_audio_path),
-                    ref_text=voice.ref_text,
-                    model_size=model_size
-                )
-                
-                # Obtener el prompt recién creado
-                prompt_data = tts_service._voice_clone_prompts.get(temp_prompt_id)
-                
-                if prompt_data:
-                    # Guardar el prompt en el voice_manager para futuros usos
-                    voice_manager._prompts[voice_id] = prompt_data
-                    logger.info(f"Prompt recreado exitosamente para voz {voice_id}")
-                else:
-                    raise ValueError("No se pudo recrear el prompt de voz desde el audio de referencia")
+            if prompt_data:
+                # Guardar el prompt en el voice_manager para futuros usos
+                voice_manager._prompts[voice_id] = prompt_data
+                logger.info("Prompt recreado exitosamente para voz %s", voice_id)
             else:
-                logger.error(f"No se encontró el audio de referencia en: {voice_audio_path}")
-                raise ValueError(
-                    "Prompt de voz no disponible en memoria y no se encontró el audio de referencia guardado. "
-                    "Es posible que el servidor se haya reiniciado. Por favor, recree la voz clonada."
-                )
-        
-        progress_callback("loading_model", 40, "Cargando modelo...")
-        
-        language = language or voice.language
-        
-        # Determinar parámetros de generación
-        if use_voice_defaults and voice.generation_params:
-            final_generation_params = voice.generation_params
+                raise ValueError("No se pudo recrear el prompt de voz desde el audio de referencia")
         else:
-            final_generation_params = generation_params
-        
-        progress_callback("preparing", 50, "Preparando generación...")
-        
-        # Crear prompt temporal en el servicio TTS
-        temp_prompt_id = f"temp_{voice_id}_{int(time.time())}"
-        tts_service._voice_clone_prompts[temp_prompt_id] = prompt_data
-        
-        try:
-            progress_callback("generating", 70, "Generando audio...")
-            start_time = time.time()
-            
-            audio_result = tts_service.generate_voice_clone(
-                text=text,
-                voice_clone_prompt_id=temp_prompt_id,
-                language=language,
-                model_size=model_size,
-                generation_params=final_generation_params
+            logger.error("No se encontró el audio de referencia en: %s", voice_audio_path)
+            raise ValueError(
+                "Prompt de voz no disponible en memoria y no se encontró el audio de referencia guardado. "
+                "Es posible que el servidor se haya reiniciado. Por favor, recree la voz clonada."
             )
-            
-            progress_callback("encoding", 90, "Codificando audio...")
-            
-            audio_base64 = tts_service.audio_to_base64(audio_result, output_format)
-            
-            processing_time = time.time() - start_time
-            
-        finally:
-            # Limpiar prompt temporal
-            if temp_prompt_id in tts_service._voice_clone_prompts:
-                del tts_service._voice_clone_prompts[temp_prompt_id]
-        
-        progress_callback("finalizing", 95, "Finalizando...")
-        
-        return {
-            "success": True,
-            "audio_base64": audio_base64,
-            "sample_rate": audio_result.sample_rate,
-            "duration_seconds": audio_result.duration_seconds,
-            "model_used": audio_result.model_used,
-            "processing_time_seconds": processing_time
-        }
-        
-    except Exception as e:
-        logger.error(f"Error en process_cloned_voice_generate_job: {e}")
-        raise
+    
+    language = language or voice.language
+    
+    # Determinar parámetros de generación (copia: el modelo no debe mutar los de la voz)
+    if use_voice_defaults and voice.generation_params:
+        final_generation_params = dict(voice.generation_params)
+    else:
+        final_generation_params = dict(generation_params)
+    
+    # Registrar el prompt con un id temporal único; se libera al salir del bloque
+    with tts_service.register_prompt(prompt_data, prefix=f"temp_{voice_id}") as temp_prompt_id:
+        return _generate_voice_clone_result(
+            tts_service,
+            progress_callback,
+            temp_prompt_id,
+            text=text,
+            language=language,
+            model_size=model_size,
+            output_format=output_format,
+            generation_params=final_generation_params,
+            binary_output=data.get("binary_output", False)
+        )
 
 
 # Mapeo de tipos de job a sus procesadores
 JOB_PROCESSORS = {
-    "custom_voice": process_custom_voice_job,
-    "voice_design": process_voice_design_job,
-    "voice_clone_url": process_voice_clone_url_job,
-    "voice_clone_file": process_voice_clone_file_job,
-    "cloned_voice_generate": process_cloned_voice_generate_job,
+    **{
+        job_type: _with_result_cache(functools.partial(_run_tts_job, spec=spec))
+        for job_type, spec in JOB_SPECS.items()
+    },
+    "voice_clone_url": _with_result_cache(process_voice_clone_url_job),
+    "voice_clone_file": _with_result_cache(process_voice_clone_file_job),
+    "cloned_voice_generate": _with_result_cache(process_cloned_voice_generate_job),
 }
 
 
@@ -6,16 +6,44 @@ import json
 import time
 import logging
 import threading
+import shutil
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Optional, Callable, List
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
-import requests
+import httpx
 
 logger = logging.getLogger(__name__)
 
 
+def _use_hf_transfer() -> bool:
+    """
+    Indica si usar hf_transfer (descargador en Rust con varias conexiones por archivo).
+    Requiere el paquete instalado; HF_HUB_DISABLE_TRANSFER=1 lo desactiva, ya que
+    hf_transfer no reanuda descargas interrumpidas.
+    """
+    if os.getenv("HF_HUB_DISABLE_TRANSFER", "0").lower() in ("1", "true", "yes"):
+        return False
+    return importlib.util.find_spec("hf_transfer") is not None
+
+
+def _fadvise(fd: int, advice_name: str):
+    """
+    Aplica posix_fadvise a un archivo completo (solo Linux; sin efecto si no está disponible).
+    DONTNEED saca de la caché de páginas los archivos recién escritos para que no expulsen
+    otros más usados; WILLNEED los precarga antes de cargar el modelo.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, getattr(os, advice_name))
+    except OSError as e:
+        logger.debug(f"posix_fadvise({advice_name}) no aplicado: {e}")
+
+
 @dataclass
 class DownloadProgress:
     """Estado de descarga de un modelo."""
@@ -80,6 +108,12 @@ class ModelManager:
         }
     }
     
+    # Descarga directa (sin huggingface_hub): archivos simultáneos y partición por rangos
+    FILE_WORKERS = 4
+    RANGE_PARTS = 8
+    RANGE_MIN_SIZE = 64 * 1024 * 1024
+    READ_CHUNK = 1 << 20
+    
     def __init__(self, cache_dir: str = None):
         # Usar ruta proporcionada, HF_HOME, o /app/models por defecto
         self.cache_dir = Path(cache_dir or os.getenv("HF_HOME", "/app/models"))
@@ -90,6 +124,23 @@ class ModelManager:
         self._progress_callbacks: List[Callable] = []
         self._lock = threading.Lock()
         
+        # Clientes compartidos (thread-safe). Sin compresión: los safetensors no se comprimen
+        # y gzip rompería los rangos
+        client_options = dict(headers={"Accept-Encoding": "identity"}, timeout=60, follow_redirects=True)
+        # HEAD y archivos pequeños: con h2 instalado se multiplexan sobre una conexión HTTP/2
+        self._client = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=self.FILE_WORKERS),
+            **client_options
+        )
+        # Rangos en paralelo: HTTP/1.1 con una conexión TCP por rango, que es de donde sale el
+        # aumento de ancho de banda (sobre HTTP/2 compartirían una sola conexión)
+        self._range_client = httpx.Client(
+            http2=False,
+            limits=httpx.Limits(max_connections=self.FILE_WORKERS * self.RANGE_PARTS),
+            **client_options
+        )
+        
         logger.info(f"ModelManager inicializado - Cache: {self.cache_dir}")
     
     def register_progress_callback(self, callback: Callable):
@@ -197,7 +248,6 @@ class ModelManager:
         Se ejecuta automáticamente si detecta que faltan archivos.
         """
         try:
-            import shutil
             from huggingface_hub import hf_hub_download
             
             config = self.MODELS_CONFIG[model_size][model_type]
@@ -251,7 +301,7 @@ class ModelManager:
             return False
     
     def ensure_model_downloaded(self, model_size: str, model_type: str, 
-                                progress_callback: Callable = None) -> bool:
+                                progress_callback: Callable = None, prefetch: bool = True) -> bool:
         """
         Asegura que un modelo esté descargado. Descarga si es necesario.
         
@@ -259,6 +309,8 @@ class ModelManager:
             model_size: "1.7B" o "0.6B"
             model_type: "voice_clone", "custom_voice", "voice_design"
             progress_callback: Función opcional para recibir progreso
+            prefetch: Precargar los pesos en la caché de páginas tras la descarga
+                      (desactivar si el modelo no se va a cargar enseguida)
         
         Returns:
             True si el modelo está listo, False en caso de error
@@ -280,7 +332,8 @@ class ModelManager:
             
             # Iniciar descarga
             logger.info(f"Descargando modelo {repo_id}...")
-            self._update_progress(repo_id, status="downloading", started_at=datetime.now().isoformat())
+            self._update_progress(repo_id, status="downloading", started_at=datetime.now().isoformat(),
+                                 bytes_downloaded=0, bytes_total=0)
             
             # Descargar archivos principales
             model_dir = self._download_model_files(repo_id, config)
@@ -289,6 +342,7 @@ class ModelManager:
                 self._update_progress(repo_id, status="completed", progress_percent=100,
                                      completed_at=datetime.now().isoformat())
                 logger.info(f"Modelo {repo_id} descargado correctamente")
+                self._advise_weights(model_dir, "POSIX_FADV_WILLNEED" if prefetch else "POSIX_FADV_DONTNEED")
                 return True
             else:
                 self._update_progress(repo_id, status="error", 
@@ -304,72 +358,242 @@ class ModelManager:
             if progress_callback and progress_callback in self._progress_callbacks:
                 self._progress_callbacks.remove(progress_callback)
     
+    def _advise_weights(self, model_dir: Path, advice_name: str):
+        """Aplica posix_fadvise a los safetensors del modelo (incluido el speech_tokenizer)."""
+        for weights_path in model_dir.glob("**/*.safetensors"):
+            try:
+                fd = os.open(weights_path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                _fadvise(fd, advice_name)
+            finally:
+                os.close(fd)
+    
+    def _snapshot_progress_class(self, repo_id: str):
+        """Barra tqdm de huggingface_hub que reenvía el avance por archivos a _update_progress."""
+        from huggingface_hub.utils import tqdm as hf_tqdm
+        
+        manager = self
+        
+        class _ProgressTqdm(hf_tqdm):
+            def update(self, n=1):
+                result = super().update(n)
+                # Solo la barra global (archivos completados); las de bytes por archivo se ignoran
+                if self.unit != "B" and self.total:
+                    manager._update_progress(repo_id, progress_percent=self.n / self.total * 100)
+                return result
+        
+        return _ProgressTqdm
+    
+    def _download_snapshot(self, repo_id: str, config: Dict) -> Path:
+        """
+        Descarga los archivos del modelo con snapshot_download (en paralelo y con hf_transfer
+        si está disponible), dejando el layout estándar del caché de Hugging Face.
+        """
+        from huggingface_hub import constants as hf_constants, snapshot_download
+        
+        # huggingface_hub lee la variable al importarse, normalmente antes que este módulo
+        use_transfer = _use_hf_transfer()
+        os.environ["HF_HUB_ENABLE_HF_TRANSFER"] = "1" if use_transfer else "0"
+        hf_constants.HF_HUB_ENABLE_HF_TRANSFER = use_transfer
+        
+        allow_patterns = list(config.get("files", [])) + [
+            f"speech_tokenizer/{filename}" for filename in config.get("speech_tokenizer_files", [])
+        ]
+        logger.info(f"snapshot_download de {repo_id} (hf_transfer: {'sí' if use_transfer else 'no'})")
+        local_path = snapshot_download(
+            repo_id=repo_id,
+            cache_dir=str(self.cache_dir),
+            allow_patterns=allow_patterns,
+            max_workers=8,
+            tqdm_class=self._snapshot_progress_class(repo_id)
+        )
+        return Path(local_path)
+    
     def _download_model_files(self, repo_id: str, config: Dict) -> Optional[Path]:
         """Descarga los archivos de un modelo."""
+        try:
+            return self._download_snapshot(repo_id, config)
+        except ImportError:
+            logger.warning("huggingface_hub no disponible, descargando archivo a archivo")
+        except Exception as e:
+            logger.warning(f"snapshot_download falló para {repo_id} ({e}), descargando archivo a archivo")
+        
         model_name = repo_id.split("/")[-1]
         
         # Crear estructura de directorios
         snapshot_id = datetime.now().strftime("%Y%m%d%H%M%S")
         model_dir = self.cache_dir / f"models--Qwen--{model_name}" / "snapshots" / snapshot_id
         model_dir.mkdir(parents=True, exist_ok=True)
+        tokenizer_dir = model_dir / "speech_tokenizer"
+        tokenizer_dir.mkdir(exist_ok=True)
         
         base_url = f"https://huggingface.co/{repo_id}/resolve/main"
         
-        # Descargar archivos principales
-        files_to_download = config.get("files", [])
-        for i, filename in enumerate(files_to_download):
-            progress = (i / len(files_to_download)) * 50  # 50% para archivos principales
-            self._update_progress(repo_id, progress_percent=progress, current_file=filename)
-            
-            url = f"{base_url}/{filename}"
-            dest_path = model_dir / filename
-            
-            if not self._download_file(url, dest_path):
-                logger.warning(f"No se pudo descargar {filename}, continuando...")
+        # (nombre, url, destino) de archivos principales y del speech_tokenizer
+        downloads = [
+            (filename, f"{base_url}/{filename}", model_dir / filename)
+            for filename in config.get("files", [])
+        ] + [
+            (f"speech_tokenizer/{filename}", f"{base_url}/speech_tokenizer/{filename}", tokenizer_dir / filename)
+            for filename in config.get("speech_tokenizer_files", [])
+        ]
         
-        # Descargar archivos del speech_tokenizer
-        tokenizer_files = config.get("speech_tokenizer_files", [])
-        tokenizer_dir = model_dir / "speech_tokenizer"
-        tokenizer_dir.mkdir(exist_ok=True)
+        # Varios archivos a la vez; cada uno grande se parte además en rangos paralelos
+        all_ok = True
+        with ThreadPoolExecutor(max_workers=self.FILE_WORKERS) as pool:
+            futures = {
+                pool.submit(self._download_file, url, dest_path, repo_id): name
+                for name, url, dest_path in downloads
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                name = futures[future]
+                self._update_progress(repo_id, progress_percent=completed / len(downloads) * 100,
+                                     current_file=name)
+                result = future.result()
+                if result is None:
+                    logger.warning(f"{name} no existe en {repo_id}, se omite")
+                elif not result:
+                    logger.error(f"No se pudo descargar {name}")
+                    all_ok = False
         
-        for i, filename in enumerate(tokenizer_files):
-            progress = 50 + (i / len(tokenizer_files)) * 50  # 50-100% para speech_tokenizer
-            self._update_progress(repo_id, progress_percent=progress, 
-                                 current_file=f"speech_tokenizer/{filename}")
-            
-            url = f"{base_url}/speech_tokenizer/{filename}"
-            dest_path = tokenizer_dir / filename
-            
-            if not self._download_file(url, dest_path):
-                logger.error(f"No se pudo descargar speech_tokenizer/{filename}")
+        if not all_ok:
+            # Sin snapshot incompleto: _get_model_dir no debe encontrarlo en el siguiente intento
+            shutil.rmtree(model_dir, ignore_errors=True)
+            return None
+        return model_dir
+    
+    def _add_downloaded_bytes(self, model_id: str, done: int = 0, total: int = 0):
+        """Suma bytes descargados/totales al progreso (llamado desde varios hilos)."""
+        with self._lock:
+            progress = self._download_progress.get(model_id)
+            if progress is None:
+                return
+            progress.bytes_downloaded += done
+            progress.bytes_total += total
+            self._notify_progress(progress)
+    
+    def _download_file(self, url: str, dest_path: Path, model_id: str = None) -> Optional[bool]:
+        """
+        Descarga un archivo individual, por rangos en paralelo si es grande.
+        Se escribe en un .part que solo se renombra al destino si la descarga es completa.
+        
+        Returns:
+            True si se descargó, False si falló, None si el archivo no existe en el repo (404)
+        """
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            head = self._client.head(url)
+            if head.status_code == 404:
                 return None
+            head.raise_for_status()
+            total_size = int(head.headers.get('content-length', 0))
+            accepts_ranges = head.headers.get('accept-ranges', '').lower() == 'bytes'
+        except Exception as e:
+            logger.warning(f"HEAD fallido para {url}: {e}")
+            total_size, accepts_ranges = 0, False
         
-        return model_dir
+        if model_id and total_size:
+            self._add_downloaded_bytes(model_id, total=total_size)
+        
+        part_path = dest_path.with_name(dest_path.name + ".part")
+        try:
+            if accepts_ranges and total_size >= self.RANGE_MIN_SIZE:
+                ok = self._download_ranges(url, part_path, total_size, model_id)
+            else:
+                ok = self._download_single(url, part_path, model_id)
+            if ok:
+                os.replace(part_path, dest_path)
+                return True
+        except OSError as e:
+            logger.error(f"Error escribiendo {dest_path}: {e}")
+        
+        part_path.unlink(missing_ok=True)
+        return False
+    
+    def _download_ranges(self, url: str, dest_path: Path, total_size: int, model_id: str = None) -> bool:
+        """Descarga un archivo en RANGE_PARTS rangos paralelos escritos con pwrite sobre el archivo reservado."""
+        fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                os.posix_fallocate(fd, 0, total_size)
+            except (AttributeError, OSError):
+                # Sin posix_fallocate (o no soportado por el sistema de archivos)
+                os.ftruncate(fd, total_size)
+            
+            part_size = -(-total_size // self.RANGE_PARTS)
+            ranges = [(start, min(start + part_size, total_size) - 1)
+                      for start in range(0, total_size, part_size)]
+            with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                results = list(pool.map(
+                    lambda r: self._download_range(url, fd, r[0], r[1], model_id), ranges
+                ))
+            _fadvise(fd, "POSIX_FADV_DONTNEED")
+        finally:
+            os.close(fd)
+        
+        if not all(results):
+            logger.error(f"No se pudo descargar {url} por rangos")
+            return False
+        return True
     
-    def _download_file(self, url: str, dest_path: Path) -> bool:
-        """Descarga un archivo individual con reintentos."""
+    def _download_range(self, url: str, fd: int, start: int, end: int, model_id: str = None) -> bool:
+        """Descarga el rango [start, end] en su posición del archivo, con reintentos."""
         max_retries = 3
         
         for attempt in range(max_retries):
+            offset = start
             try:
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                with self._range_client.stream("GET", url, headers={"Range": f"bytes={start}-{end}"}) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise IOError("el servidor ignoró la cabecera Range")
+                    
+                    for chunk in response.iter_bytes(chunk_size=self.READ_CHUNK):
+                        if chunk:
+                            offset += os.pwrite(fd, chunk, offset)
                 
-                response = requests.get(url, stream=True, timeout=60)
-                response.raise_for_status()
+                if offset != end + 1:
+                    raise IOError(f"rango incompleto: {offset - start} de {end + 1 - start} bytes")
                 
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
+                if model_id:
+                    self._add_downloaded_bytes(model_id, done=end + 1 - start)
+                return True
                 
-                with open(dest_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
+            except Exception as e:
+                logger.warning(f"Intento {attempt + 1} fallido para {url} [{start}-{end}]: {e}")
+                if attempt < max_retries - 1:
+                    time.sleep(2 ** attempt)  # Backoff exponencial
+        
+        return False
+    
+    def _download_single(self, url: str, dest_path: Path, model_id: str = None) -> bool:
+        """Descarga un archivo en una sola petición, con reintentos."""
+        max_retries = 3
+        
+        for attempt in range(max_retries):
+            try:
+                with self._client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    
+                    total_size = int(response.headers.get('content-length', 0))
+                    
+                    # writelines consume el iterador en C, sin un bucle Python por bloque
+                    with open(dest_path, 'wb') as f:
+                        f.writelines(response.iter_bytes(chunk_size=self.READ_CHUNK))
+                        f.flush()
+                        _fadvise(f.fileno(), "POSIX_FADV_DONTNEED")
                 
-                # Verificar tamaño
+                downloaded = dest_path.stat().st_size
+                
+                # Verificar tamaño (un archivo truncado se reintenta)
                 if total_size > 0 and downloaded != total_size:
-                    logger.warning(f"Tamaño descargado no coincide: {downloaded} vs {total_size}")
+                    raise IOError(f"Tamaño descargado no coincide: {downloaded} vs {total_size}")
                 
+                if model_id:
+                    self._add_downloaded_bytes(model_id, done=downloaded)
                 return True
                 
             except Exception as e:
@@ -381,13 +605,14 @@ class ModelManager:
         
         return False
     
+    
     def predownload_all_models(self, model_size: str = "1.7B") -> bool:
         """Descarga todos los modelos de un tamaño específico al inicio."""
         logger.info(f"Pre-descargando modelos {model_size}...")
         
         all_success = True
         for model_type in ["voice_clone", "custom_voice", "voice_design"]:
-            if not self.ensure_model_downloaded(model_size, model_type):
+            if not self.ensure_model_downloaded(model_size, model_type, prefetch=False):
                 logger.error(f"No se pudo descargar {model_type}")
                 all_success = False
         
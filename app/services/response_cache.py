@@ -0,0 +1,85 @@
+"""
+ResponseCache - Caché LRU con TTL para respuestas de generación de audio.
+Evita repetir la inferencia cuando llega la misma petición (texto, voz y parámetros).
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Entrada de la caché."""
+    value: Any
+    expires_at: float
+    tag: Optional[str] = None     # Permite invalidar en bloque (ej: voice_id)
+    size: int = 0                 # Tamaño en bytes declarado al guardar (para max_bytes)
+
+
+class ResponseCache:
+    """
+    Caché LRU acotada con expiración por tiempo.
+    Es thread-safe; las claves son el request_hash (JSON canónico) de la petición.
+    Con max_bytes > 0 también se acota la suma de los tamaños pasados a set().
+    """
+
+    def __init__(self, max_size: int = 128, ttl_seconds: float = 600.0, max_bytes: int = 0):
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Obtiene un valor si existe y no ha expirado."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at < time.time():
+                del self._entries[key]
+                self._bytes -= entry.size
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, tag: Optional[str] = None, size: int = 0):
+        """Guarda un valor, expulsando los menos usados si se supera el tamaño máximo."""
+        if self._max_size <= 0 or (self._max_bytes > 0 and size > self._max_bytes):
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = CacheEntry(value=value, expires_at=time.time() + self._ttl, tag=tag, size=size)
+            self._bytes += size
+            while len(self._entries) > self._max_size or (self._max_bytes > 0 and self._bytes > self._max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Elimina todas las entradas con la etiqueta indicada."""
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if entry.tag == tag]
+            for k in keys:
+                self._bytes -= self._entries.pop(k).size
+        if keys:
+            logger.info(f"Caché: {len(keys)} entradas invalidadas ({tag})")
+        return len(keys)
+
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
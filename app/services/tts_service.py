@@ -343,13 +343,22 @@ TTSService - Gestión de modelos Qwen3-TTS y generación de audio.
 import os
 import io
 import time
-import base64
+import secrets
 import logging
 import tempfile
+import threading
+import functools
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Tuple, Any, Iterator
 from dataclasses import dataclass
 
+# Codec base64 vectorizado (SIMD) si está disponible; misma API que la stdlib
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 import torch
 import soundfile as sf
 import numpy as np
@@ -365,6 +374,24 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _flash_attn_available() -> bool:
+    """Indica si el paquete flash_attn (FlashAttention-2) está instalado."""
+    try:
+        import flash_attn  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _gpu_bound(method):
+    """Ejecuta el método de TTSService dentro de su hueco de GPU (ver TTSService.gpu_slot)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.gpu_slot():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 @dataclass
 class AudioResult:
     """Resultado de generación de audio."""
@@ -406,21 +433,35 @@ class TTSService:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.default_model_size = default_model_size
-        # Flash attention requiere compilación con nvcc, deshabilitado por defecto
-        self.use_flash_attention = False  # use_flash_attention and torch.cuda.is_available()
+        # FlashAttention-2 solo si el paquete flash_attn está instalado (requiere compilación con nvcc)
+        self.use_flash_attention = use_flash_attention and torch.cuda.is_available() and _flash_attn_available()
         
         # Cache de modelos cargados
         self._models: Dict[str, Any] = {}
         self._voice_clone_prompts: Dict[str, Any] = {}
+        self._prompts_lock = threading.Lock()
+        # Uso del modelo: como máximo GPU_CONCURRENCY llamadas a la vez, compartido por rutas y
+        # jobs. Cargar un modelo libera los de las demás llamadas, así que el trabajo de GPU no
+        # debe solaparse. Es reentrante por hilo para que los métodos puedan llamarse entre sí
+        self._gpu_sem = threading.BoundedSemaphore(int(os.getenv("GPU_CONCURRENCY", "1")))
+        self._gpu_local = threading.local()
         
         # Configuración de device - optimizaciones para velocidad máxima
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        # Usar float16 para máxima velocidad en RTX 3060/3060Ti 12GB
-        # Cuando se usa CPU offload, float16 sigue funcionando bien
-        self.dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+        # bfloat16 en GPUs Ampere+ (RTX 30xx en adelante): mismo ancho de banda que float16
+        # pero con el rango de float32, y es el dtype con el que se publica Qwen3-TTS.
+        # En GPUs anteriores se mantiene float16; en CPU, float32
+        if torch.cuda.is_available():
+            self.dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        else:
+            self.dtype = torch.float32
         
         # Configuración de memoria
         self.cpu_offload_enabled = True  # Habilitar offload a CPU por defecto
+        # Modo residente: mantener cargado el último modelo usado y solo intercambiarlo al cambiar
+        # de variante (custom_voice / voice_design / voice_clone). Por defecto se libera tras cada
+        # generación para dejar la VRAM libre entre peticiones
+        self.keep_model_resident = os.getenv("TTS_KEEP_MODEL_RESIDENT", "0") == "1"
         self.vram_safety_margin = 1.0    # Margen de seguridad en GB
         
         # Optimizaciones de PyTorch para máximo rendimiento
@@ -578,6 +619,7 @@ class TTSService:
         
         return available_vram < required_memory
     
+    @_gpu_bound
     def _get_model(self, model_type: str, model_size: Optional[str] = None, force_reload: bool = False) -> Any:
         """
         Obtiene un modelo, cargándolo si es necesario (lazy loading).
@@ -597,6 +639,10 @@ class TTSService:
         size = model_size or self.default_model_size
         cache_key = f"{size}_{model_type}"
         
+        # En modo residente el modelo activo se reutiliza tal cual (sin recarga en frío)
+        if self.keep_model_resident and cache_key in self._models:
+            return self._models[cache_key]
+        
         # Siempre limpiar memoria antes de cargar un modelo para evitar OOM
         if torch.cuda.is_available():
             logger.info("Limpiando memoria CUDA antes de cargar modelo...")
@@ -641,6 +687,8 @@ class TTSService:
                         "dtype": self.dtype,  # Usar dtype en lugar de torch_dtype (deprecado)
                         "low_cpu_mem_usage": True,
                     }
+                    if self.use_flash_attention and not use_cpu_offload:
+                        load_kwargs["attn_implementation"] = "flash_attention_2"
                     
                     # Configurar device_map según la disponibilidad de VRAM
                     if torch.cuda.is_available():
@@ -711,6 +759,12 @@ class TTSService:
                         time.sleep(1)
                         continue
                     
+                    # Si falla FlashAttention-2 (p. ej. binario incompatible), reintentar con SDPA
+                    if self.use_flash_attention and "flash" in error_msg.lower():
+                        logger.warning("FlashAttention-2 no disponible para este modelo. Reintentando sin ella...")
+                        self.use_flash_attention = False
+                        continue
+                    
                     # Si es error de speech_tokenizer, intentar corregir
                     if "speech_tokenizer" in error_msg and "preprocessor_config" in error_msg:
                         logger.info(f"Detectado error de speech_tokenizer. Intentando corrección...")
@@ -735,12 +789,44 @@ class TTSService:
         
         return self._models[cache_key]
     
+    @contextmanager
+    def gpu_slot(self) -> Iterator[None]:
+        """Reserva un hueco de GPU para el hilo actual (reentrante)."""
+        depth = getattr(self._gpu_local, "depth", 0)
+        if depth == 0:
+            self._gpu_sem.acquire()
+        self._gpu_local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._gpu_local.depth = depth
+            if depth == 0:
+                self._gpu_sem.release()
+    
     def get_loaded_models(self) -> List[str]:
         """Retorna lista de modelos actualmente cargados."""
         return list(self._models.keys())
     
+    @_gpu_bound
+    def ensure_model(self, model_type: str, model_size: Optional[str] = None) -> None:
+        """
+        Deja activo el modelo indicado, intercambiándolo por el que hubiera cargado.
+        Es un no-op si ya está activo. Solo tiene efecto en modo residente: sin él
+        los modelos se cargan en cada generación y no hay nada que precargar.
+        
+        Args:
+            model_type: Tipo de modelo ('custom_voice', 'voice_design', 'voice_clone')
+            model_size: Tamaño del modelo a usar
+        """
+        if self.keep_model_resident:
+            self._get_model(model_type, model_size)
+    
+    @_gpu_bound
     def _cleanup_memory(self):
         """Limpia memoria CUDA antes de operaciones pesadas."""
+        if self.keep_model_resident:
+            # El modelo activo se conserva; _get_model lo intercambia si hace falta otro
+            return
         if torch.cuda.is_available():
             logger.info("Limpiando memoria CUDA...")
             
@@ -760,8 +846,11 @@ class TTSService:
             
             logger.info(f"Memoria CUDA limpia: {torch.cuda.memory_allocated() / 1e9:.2f} GB")
     
+    @_gpu_bound
     def _immediate_cleanup(self):
         """Limpieza inmediata después de generación para liberar memoria rápido."""
+        if self.keep_model_resident:
+            return
         if torch.cuda.is_available():
             logger.info("Limpieza inmediata post-generación...")
             
@@ -782,6 +871,7 @@ class TTSService:
             
             logger.info(f"Memoria post-limpieza: {torch.cuda.memory_allocated() / 1e9:.2f} GB libre")
     
+    @_gpu_bound
     def cleanup(self):
         """Libera recursos y modelos cargados."""
         logger.info("Limpiando recursos...")
@@ -818,12 +908,46 @@ class TTSService:
         Returns:
             AudioResult con el audio generado
         """
+        return self.generate_custom_voice_batch(
+            texts=[text],
+            speakers=[speaker],
+            languages=[language],
+            instructions=[instruction],
+            model_size=model_size,
+            generation_params=generation_params
+        )[0]
+    
+    @_gpu_bound
+    def generate_custom_voice_batch(
+        self,
+        texts: List[str],
+        speakers: List[str],
+        languages: List[str],
+        instructions: List[Optional[str]],
+        model_size: Optional[str] = None,
+        generation_params: Optional[Dict] = None
+    ) -> List[AudioResult]:
+        """
+        Genera varias locuciones de Custom Voice en una sola pasada del modelo.
+        Qwen3-TTS acepta listas en text/language/speaker/instruct y procesa el lote completo a la vez.
+        
+        Args:
+            texts: Textos a convertir
+            speakers: Speaker de cada texto
+            languages: Idioma de cada texto
+            instructions: Instrucción (o None) de cada texto
+            model_size: Tamaño del modelo a usar
+            generation_params: Parámetros de generación comunes a todo el lote
+        
+        Returns:
+            Lista de AudioResult en el mismo orden que los textos
+        """
         # Forzar liberación de memoria antes de generar
         self._cleanup_memory()
         
         model = self._get_model("custom_voice", model_size)
         
-        logger.info(f"Generando Custom Voice - Speaker: {speaker}, Lang: {language}")
+        logger.info(f"Generando Custom Voice - Lote: {len(texts)}, Speakers: {speakers}, Lang: {languages}")
         start_time = time.time()
         
         # Preparar kwargs con parámetros de generación
@@ -835,31 +959,31 @@ class TTSService:
         try:
             # Usar no_grad para reducir uso de memoria
             with torch.no_grad():
-                wavs, sr = model.generate_custom_voice(
-                    text=text,
-                    language=language,
-                    speaker=speaker,
-                    instruct=instruction,
-                    **kwargs
-                )
-            
-            audio_data = wavs[0]
-            duration = len(audio_data) / sr
-            processing_time = time.time() - start_time
+                if len(texts) == 1:
+                    wavs, sr = model.generate_custom_voice(
+                        text=texts[0],
+                        language=languages[0],
+                        speaker=speakers[0],
+                        instruct=instructions[0],
+                        **kwargs
+                    )
+                else:
+                    wavs, sr = model.generate_custom_voice(
+                        text=list(texts),
+                        language=list(languages),
+                        speaker=list(speakers),
+                        instruct=list(instructions),
+                        **kwargs
+                    )
             
-            logger.info(f"Audio generado: {duration:.2f}s en {processing_time:.2f}s")
+            results = self._build_results(wavs, sr, f"{model_size or self.default_model_size}_custom_voice")
             
-            result = AudioResult(
-                audio_data=audio_data,
-                sample_rate=sr,
-                duration_seconds=duration,
-                model_used=f"{model_size or self.default_model_size}_custom_voice"
-            )
+            logger.info(f"Lote generado: {len(results)} audios en {time.time() - start_time:.2f}s")
             
             # LIMPIAR MEMORIA INMEDIATAMENTE DESPUÉS de generar
             self._immediate_cleanup()
             
-            return result
+            return results
             
         except Exception as e:
             logger.error(f"Error en generate_custom_voice: {e}")
@@ -892,13 +1016,42 @@ class TTSService:
         Returns:
             AudioResult con el audio generado
         """
+        return self.generate_voice_design_batch(
+            texts=[text],
+            voice_descriptions=[voice_description],
+            languages=[language],
+            model_size=model_size,
+            generation_params=generation_params
+        )[0]
+    
+    @_gpu_bound
+    def generate_voice_design_batch(
+        self,
+        texts: List[str],
+        voice_descriptions: List[str],
+        languages: List[str],
+        model_size: Optional[str] = None,
+        generation_params: Optional[Dict] = None
+    ) -> List[AudioResult]:
+        """
+        Genera varias locuciones de Voice Design en una sola pasada del modelo.
+        
+        Args:
+            texts: Textos a convertir
+            voice_descriptions: Descripción de la voz de cada texto
+            languages: Idioma de cada texto
+            model_size: Tamaño del modelo a usar
+            generation_params: Parámetros de generación comunes a todo el lote
+        
+        Returns:
+            Lista de AudioResult en el mismo orden que los textos
+        """
         # Forzar liberación de memoria antes de generar
         self._cleanup_memory()
         
         model = self._get_model("voice_design", model_size)
         
-        logger.info(f"Generando Voice Design - Lang: {language}")
-        logger.debug(f"Voice description: {voice_description[:100]}...")
+        logger.info(f"Generando Voice Design - Lote: {len(texts)}, Lang: {languages}")
         start_time = time.time()
         
         # Preparar kwargs con parámetros de generación
@@ -909,30 +1062,29 @@ class TTSService:
         
         try:
             with torch.no_grad():
-                wavs, sr = model.generate_voice_design(
-                    text=text,
-                    language=language,
-                    instruct=voice_description,
-                    **kwargs
-                )
-            
-            audio_data = wavs[0]
-            duration = len(audio_data) / sr
-            processing_time = time.time() - start_time
+                if len(texts) == 1:
+                    wavs, sr = model.generate_voice_design(
+                        text=texts[0],
+                        language=languages[0],
+                        instruct=voice_descriptions[0],
+                        **kwargs
+                    )
+                else:
+                    wavs, sr = model.generate_voice_design(
+                        text=list(texts),
+                        language=list(languages),
+                        instruct=list(voice_descriptions),
+                        **kwargs
+                    )
             
-            logger.info(f"Audio generado: {duration:.2f}s en {processing_time:.2f}s")
+            results = self._build_results(wavs, sr, f"{model_size or self.default_model_size}_voice_design")
             
-            result = AudioResult(
-                audio_data=audio_data,
-                sample_rate=sr,
-                duration_seconds=duration,
-                model_used=f"{model_size or self.default_model_size}_voice_design"
-            )
+            logger.info(f"Lote generado: {len(results)} audios en {time.time() - start_time:.2f}s")
             
             # LIMPIAR MEMORIA INMEDIATAMENTE DESPUÉS de generar
             self._immediate_cleanup()
             
-            return result
+            return results
             
         except Exception as e:
             logger.error(f"Error en generate_voice_design: {e}")
@@ -940,10 +1092,25 @@ class TTSService:
             self._immediate_cleanup()
             raise
     
+    def _build_results(self, wavs: List[np.ndarray], sr: int, model_used: str) -> List[AudioResult]:
+        """Convierte la salida (wavs, sr) del modelo en una lista de AudioResult."""
+        results = []
+        for audio_data in wavs:
+            duration = len(audio_data) / sr
+            logger.info(f"Audio generado: {duration:.2f}s")
+            results.append(AudioResult(
+                audio_data=audio_data,
+                sample_rate=sr,
+                duration_seconds=duration,
+                model_used=model_used
+            ))
+        return results
+    
     # ============================================================
     # VOICE CLONE
     # ============================================================
     
+    @_gpu_bound
     def create_voice_clone_prompt(
         self,
         ref_audio_path: str,
@@ -1000,6 +1167,38 @@ class TTSService:
         
         return prompt_id
     
+    @contextmanager
+    def register_prompt(self, prompt_data: Any, prefix: str = "temp") -> Iterator[str]:
+        """
+        Registra temporalmente un prompt de clonación ya creado (p. ej. de una voz guardada).
+        El id es único por llamada y el prompt se elimina al salir del bloque, incluso si hay error.
+        
+        Args:
+            prompt_data: Prompt de clonación
+            prefix: Prefijo del id temporal (útil en logs)
+        
+        Yields:
+            ID del prompt registrado, para usar con generate_voice_clone
+        """
+        prompt_id = f"{prefix}_{secrets.token_hex(8)}"
+        with self._prompts_lock:
+            self._voice_clone_prompts[prompt_id] = prompt_data
+        try:
+            yield prompt_id
+        finally:
+            with self._prompts_lock:
+                self._voice_clone_prompts.pop(prompt_id, None)
+    
+    def has_prompt(self, prompt_id: str) -> bool:
+        """Indica si un prompt de clonación sigue registrado en el servicio."""
+        return prompt_id in self._voice_clone_prompts
+    
+    def release_prompt(self, prompt_id: str):
+        """Elimina un prompt de clonación registrado (no falla si ya no existe)."""
+        with self._prompts_lock:
+            self._voice_clone_prompts.pop(prompt_id, None)
+    
+    @_gpu_bound
     def generate_voice_clone(
         self,
         text: str,
@@ -1102,6 +1301,7 @@ class TTSService:
             self._immediate_cleanup()
             raise
     
+    @_gpu_bound
     def generate_voice_clone_from_file(
         self,
         text: str,
@@ -1124,9 +1324,51 @@ class TTSService:
         Returns:
             AudioResult con el audio generado
         """
+        # Para voice clone, usar 0.6B por defecto si no se especifica (menos uso de memoria)
+        size = model_size or "0.6B"
+        
+        try:
+            prompt_id = self.create_voice_clone_prompt_from_file(ref_audio_file, ref_text, size)
+            
+            # LIMPIEZA EXTRA entre crear prompt y generar
+            logger.info("Limpieza entre prompt y generación...")
+            self._immediate_cleanup()
+            
+            result = self.generate_voice_clone(text, prompt_id, language, size)
+            
+            # LIMPIEZA FINAL después de todo el proceso de voice clone
+            logger.info("Limpieza final post-voice-clone...")
+            self._immediate_cleanup()
+            
+            return result
+            
+        except Exception as e:
+            # Asegurar limpieza en caso de error
+            logger.error(f"Error en voice clone from file: {e}")
+            self._immediate_cleanup()
+            raise
+    
+    @_gpu_bound
+    def create_voice_clone_prompt_from_file(
+        self,
+        ref_audio_file: bytes,
+        ref_text: str,
+        model_size: Optional[str] = None
+    ) -> str:
+        """
+        Crea un prompt de clonación desde el contenido de un archivo de audio.
+        El audio se convierte a WAV mono 24kHz con ffmpeg antes de crear el prompt.
+        
+        Args:
+            ref_audio_file: Contenido del archivo de audio (bytes)
+            ref_text: Texto correspondiente al audio
+            model_size: Tamaño del modelo a usar
+        
+        Returns:
+            ID del prompt creado (para reuso)
+        """
         import subprocess
         
-        # Para voice clone, usar 0.6B por defecto si no se especifica (menos uso de memoria)
         size = model_size or "0.6B"
         
         # Limpieza agresiva de memoria antes de voice clone
@@ -1170,26 +1412,9 @@ class TTSService:
             
             logger.info(f"Audio convertido exitosamente a WAV: {wav_path}")
             
-            # Crear prompt y generar usando el WAV convertido
-            prompt_id = self.create_voice_clone_prompt(wav_path, ref_text, size)
-            
-            # LIMPIEZA EXTRA entre crear prompt y generar
-            logger.info("Limpieza entre prompt y generación...")
-            self._immediate_cleanup()
-            
-            result = self.generate_voice_clone(text, prompt_id, language, size)
-            
-            # LIMPIEZA FINAL después de todo el proceso de voice clone
-            logger.info("Limpieza final post-voice-clone...")
-            self._immediate_cleanup()
-            
-            return result
+            # Crear prompt usando el WAV convertido
+            return self.create_voice_clone_prompt(wav_path, ref_text, size)
             
-        except Exception as e:
-            # Asegurar limpieza en caso de error
-            logger.error(f"Error en voice clone from file: {e}")
-            self._immediate_cleanup()
-            raise
         finally:
             # Limpiar archivos temporales
             for path in [input_path, wav_path]:
@@ -1227,6 +1452,19 @@ class TTSService:
         Returns:
             Audio codificado en base64
         """
+        return base64.b64encode(self.audio_to_bytes(audio_result, output_format)).decode('utf-8')
+    
+    def audio_to_bytes(self, audio_result: AudioResult, output_format: str = "wav") -> bytes:
+        """
+        Convierte AudioResult a los bytes del archivo de audio en el formato pedido.
+        
+        Args:
+            audio_result: Resultado de generación
+            output_format: Formato de salida (wav, mp3, ogg, opus)
+        
+        Returns:
+            Contenido binario del archivo de audio
+        """
         import tempfile
         import subprocess
         import numpy as np
@@ -1249,7 +1487,7 @@ class TTSService:
                 # Guardar directamente como WAV
                 sf.write(output_path, audio_data, audio_result.sample_rate, subtype='PCM_16')
                 with open(output_path, 'rb') as f:
-                    return base64.b64encode(f.read()).decode('utf-8')
+                    return f.read()
             
             # Para otros formatos, usar ffmpeg desde raw PCM
             # Primero guardar como raw PCM
@@ -1285,9 +1523,7 @@ class TTSService:
             
             # Leer el archivo convertido
             with open(output_path, 'rb') as f:
-                audio_bytes = f.read()
-            
-            return base64.b64encode(audio_bytes).decode('utf-8')
+                return f.read()
             
         finally:
             # Limpiar archivo de salida si existe
@@ -5,10 +5,13 @@ import os
 import json
 import time
 import logging
+import threading
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 from dataclasses import dataclass, asdict
 
+from app.schemas.requests import intern_keys
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +59,8 @@ class VoiceManager:
         self.voices_file = self.storage_dir / "cloned_voices.json"
         self.voices: Dict[str, ClonedVoice] = {}
         self._prompts: Dict[str, Any] = {}  # Cache en memoria de los prompts
+        # La instancia se comparte entre rutas e hilos de jobs: serializa mutaciones y escrituras del JSON
+        self._lock = threading.RLock()
         
         self._load_voices()
         logger.info(f"VoiceManager inicializado. Voces cargadas: {len(self.voices)}")
@@ -70,6 +75,8 @@ class VoiceManager:
                         # Asegurar que prompt_data existe (aunque sea None)
                         if "prompt_data" not in voice_data:
                             voice_data["prompt_data"] = None
+                        if voice_data.get("generation_params"):
+                            voice_data["generation_params"] = intern_keys(voice_data["generation_params"])
                         voice = ClonedVoice(**voice_data)
                         self.voices[voice.id] = voice
                 logger.info(f"Cargadas {len(self.voices)} voces clonadas desde {self.voices_file}")
@@ -82,18 +89,19 @@ class VoiceManager:
     def _save_voices(self):
         """Guarda las voces en el archivo JSON."""
         try:
-            data = {
-                "voices": [voice.to_dict() for voice in self.voices.values()],
-                "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
-            }
-            with open(self.voices_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Guardadas {len(self.voices)} voces clonadas")
+            with self._lock:
+                data = {
+                    "voices": [voice.to_dict() for voice in self.voices.values()],
+                    "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+                }
+                with open(self.voices_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+            logger.info(f"Guardadas {len(data['voices'])} voces clonadas")
         except Exception as e:
             logger.error(f"Error guardando voces: {e}")
             raise
     
-    def _sanitize_voice_id(self, name: str) -> str:
+    def sanitize_voice_id(self, name: str) -> str:
         """
         Sanitiza un nombre para usarlo como ID de voz.
         Reemplaza espacios por guiones bajos y elimina caracteres no válidos.
@@ -142,7 +150,7 @@ class VoiceManager:
             ValueError: Si ya existe una voz con el mismo ID
         """
         # Generar ID basado solo en el nombre (sanitizado)
-        voice_id = self._sanitize_voice_id(name)
+        voice_id = self.sanitize_voice_id(name)
         
         # Verificar si ya existe una voz con este ID
         if voice_id in self.voices:
@@ -188,12 +196,16 @@ class VoiceManager:
             use_count=0
         )
         
-        # Guardar en memoria
-        self.voices[voice_id] = voice
-        self._prompts[voice_id] = prompt_data
-        
-        # Persistir
-        self._save_voices()
+        with self._lock:
+            if voice_id in self.voices:
+                raise ValueError(f"Ya existe una voz con el ID '{voice_id}'. Use un nombre diferente o elimine la voz existente primero.")
+            
+            # Guardar en memoria
+            self.voices[voice_id] = voice
+            self._prompts[voice_id] = prompt_data
+            
+            # Persistir
+            self._save_voices()
         
         logger.info(f"Voz clonada creada: {name} (ID: {voice_id})")
         return voice
@@ -208,12 +220,13 @@ class VoiceManager:
         Returns:
             La voz clonada o None si no existe
         """
-        voice = self.voices.get(voice_id)
-        if voice:
-            # Actualizar estadísticas de uso
-            voice.last_used = time.strftime("%Y-%m-%d %H:%M:%S")
-            voice.use_count += 1
-            self._save_voices()
+        with self._lock:
+            voice = self.voices.get(voice_id)
+            if voice:
+                # Actualizar estadísticas de uso
+                voice.last_used = time.strftime("%Y-%m-%d %H:%M:%S")
+                voice.use_count += 1
+                self._save_voices()
         return voice
     
     def get_prompt(self, voice_id: str) -> Optional[Any]:
@@ -262,18 +275,19 @@ class VoiceManager:
         Returns:
             La voz actualizada o None si no existe
         """
-        voice = self.voices.get(voice_id)
-        if not voice:
-            return None
-        
-        if name:
-            voice.name = name
-        if description:
-            voice.description = description
-        if generation_params is not None:
-            voice.generation_params = generation_params
-        
-        self._save_voices()
+        with self._lock:
+            voice = self.voices.get(voice_id)
+            if not voice:
+                return None
+            
+            if name:
+                voice.name = name
+            if description:
+                voice.description = description
+            if generation_params is not None:
+                voice.generation_params = generation_params
+            
+            self._save_voices()
         logger.info(f"Voz actualizada: {voice_id}")
         return voice
     
@@ -287,16 +301,16 @@ class VoiceManager:
         Returns:
             True si se eliminó, False si no existía
         """
-        if voice_id not in self.voices:
-            return False
-        
-        # Eliminar de memoria y cache
-        del self.voices[voice_id]
-        if voice_id in self._prompts:
-            del self._prompts[voice_id]
-        
-        # Persistir cambios
-        self._save_voices()
+        with self._lock:
+            if voice_id not in self.voices:
+                return False
+            
+            # Eliminar de memoria y cache
+            del self.voices[voice_id]
+            self._prompts.pop(voice_id, None)
+            
+            # Persistir cambios
+            self._save_voices()
         
         logger.info(f"Voz eliminada: {voice_id}")
         return True
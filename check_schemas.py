@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Prueba rápida de los esquemas tras compilarlos con Cython (ver setup.py).
+
+Se ejecuta en el build de Docker: comprueba que el módulo importado es la extensión
+compilada y que validación, validadores generados con exec, campos calculados y
+serialización se comportan igual que en Python puro. Sale con error si algo falla.
+"""
+
+import sys
+
+from pydantic import ValidationError
+
+import app.schemas.requests as schemas
+
+
+def main() -> int:
+    compiled = not schemas.__file__.endswith(".py")
+    print(f"app.schemas.requests: {schemas.__file__} ({'compilado' if compiled else 'Python puro'})")
+    if "--require-compiled" in sys.argv and not compiled:
+        print("✗ Se esperaba la extensión compilada")
+        return 1
+
+    # Validación desde JSON con validadores de opciones (generados con exec) y valores por defecto
+    request = schemas.CustomVoiceRequest.model_validate_json(
+        b'{"text": "Hola mundo", "speaker": "Vivian", "language": "Spanish", "temperature": 0.7}'
+    )
+    assert request.temperature == 0.7
+    assert request.to_generation_kwargs()["temperature"] == 0.7
+
+    # Los validadores deben seguir rechazando valores no válidos
+    for bad in ({"text": "x", "speaker": "Nadie"}, {"text": "x", "speaker": "Vivian", "temperature": 99}):
+        try:
+            schemas.CustomVoiceRequest(**bad)
+        except ValidationError:
+            pass
+        else:
+            print(f"✗ Se aceptó un request no válido: {bad}")
+            return 1
+
+    # Campo calculado (cached_property) y serialización de ida y vuelta
+    generate = schemas.GenerateFromClonedVoiceRequest(text="Hola", voice_id="mi_voz")
+    assert len(generate.request_hash) == 32
+    restored = schemas.GenerateFromClonedVoiceRequest.model_validate_json(
+        generate.model_dump_json(exclude={"request_hash"})
+    )
+    assert restored.request_hash == generate.request_hash
+
+    # field_validator con TypeAdapter
+    update = schemas.UpdateClonedVoiceRequest(generation_params={"temperature": 0.5})
+    assert update.generation_params == {"temperature": 0.5}
+
+    # Modelo de respuesta (frozen) serializado con to_json
+    response = schemas.TTSResponse(success=True, model_used="custom_voice", processing_time_seconds=0.1)
+    assert b'"success":true' in response.to_json()
+
+    print("✓ Esquemas verificados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -392,6 +392,9 @@ namespace Qwen3TTS.Client
 
         [JsonPropertyName("output_format")]
         public string OutputFormat { get; set; } = "wav";
+
+        [JsonPropertyName("inline")]
+        public bool Inline { get; set; } = true;
     }
 
     public class VoiceDesignRequest
@@ -407,6 +410,9 @@ namespace Qwen3TTS.Client
 
         [JsonPropertyName("output_format")]
         public string OutputFormat { get; set; } = "wav";
+
+        [JsonPropertyName("inline")]
+        public bool Inline { get; set; } = true;
     }
 
     public class VoiceCloneRequest
@@ -425,6 +431,9 @@ namespace Qwen3TTS.Client
 
         [JsonPropertyName("output_format")]
         public string OutputFormat { get; set; } = "wav";
+
+        [JsonPropertyName("inline")]
+        public bool Inline { get; set; } = true;
     }
 
     public class CreateClonedVoiceRequest
@@ -467,6 +476,9 @@ namespace Qwen3TTS.Client
 
         [JsonPropertyName("output_format")]
         public string OutputFormat { get; set; } = "wav";
+
+        [JsonPropertyName("inline")]
+        public bool Inline { get; set; } = true;
     }
 
     // Response Models
@@ -0,0 +1,28 @@
+"""
+Compilación opcional de los esquemas a extensión C con Cython.
+
+Uso (dentro de la imagen Docker o en local):
+    python3 setup.py build_ext --inplace
+
+Genera app/schemas/requests.*.so junto al .py; el import system de Python prefiere
+la extensión compilada y, si no existe, se usa el módulo en Python puro.
+
+Tras compilar, verificar la extensión con:
+    python3 check_schemas.py --require-compiled
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="qwen3-tts-schemas",
+    ext_modules=cythonize(
+        ["app/schemas/requests.py"],
+        compiler_directives={
+            "language_level": 3,
+            # Pydantic inspecciona firmas y anotaciones de los validators
+            "binding": True,
+            "annotation_typing": False,
+        },
+    ),
+)
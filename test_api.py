@@ -69,7 +69,10 @@ def test_custom_voice():
             print(f"✓ Tiempo de procesamiento: {data['processing_time_seconds']:.2f}s")
             
             # Guardar audio
-            audio_data = base64.b64decode(data['audio_base64'])
+            if data.get('audio_base64'):
+                audio_data = base64.b64decode(data['audio_base64'])
+            else:
+                audio_data = requests.get(BASE_URL.rsplit("/api/v1", 1)[0] + data['audio_url']).content
             output_file = "test_output.wav"
             with open(output_file, "wb") as f:
                 f.write(audio_data)